@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Throughput and latency benchmarks against the local mock cloud.
+
+For every fleet size the benchmark starts a MockJackeryCloud and measures
+
+- client: AsyncJackeryAPI login, device list and full-fleet refresh rounds
+  with the same bounded concurrency the coordinator uses
+- coordinator: setup (device list plus first refresh) and refresh rounds of
+  the real JackeryCoordinator; only when Home Assistant is installed
+
+and reports p50/p99 refresh latency, requests per second and setup time.
+
+    python benchmarks/bench.py --devices 1 50 500 --rounds 10 --latency-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+
+import aiohttp
+
+from mock_server import MockJackeryCloud, add_server_arguments, cloud_from_arguments
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPONENT_DIR = os.path.join(REPO_ROOT, "custom_components", "jackery")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the pct percentile of samples using nearest rank."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(
+    name: str,
+    devices: int,
+    setup_sec: float,
+    rounds: list[float],
+    requests: int,
+    elapsed: float,
+) -> dict:
+    """Build a result row."""
+    return {
+        "benchmark": name,
+        "devices": devices,
+        "setup_ms": round(setup_sec * 1000, 2),
+        "refresh_p50_ms": round(percentile(rounds, 50) * 1000, 2),
+        "refresh_p99_ms": round(percentile(rounds, 99) * 1000, 2),
+        "refresh_mean_ms": round(statistics.fmean(rounds) * 1000, 2),
+        "requests_per_sec": round(requests / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def _timed_rounds(
+    rounds: int, refresh: Callable[[], Awaitable[None]]
+) -> tuple[list[float], float]:
+    """Run refresh rounds and return their durations and the total time."""
+    durations = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        round_started = time.perf_counter()
+        await refresh()
+        durations.append(time.perf_counter() - round_started)
+    return durations, time.perf_counter() - started
+
+
+async def bench_client(
+    cloud: MockJackeryCloud, rounds: int, concurrency: int
+) -> dict:
+    """Benchmark AsyncJackeryAPI on its own."""
+    sys.path.insert(0, COMPONENT_DIR)
+    from api import AsyncJackeryAPI  # pylint: disable=import-outside-toplevel
+
+    async with aiohttp.ClientSession() as session:
+        api = AsyncJackeryAPI(session, account="bench@example.com", password="bench")
+        api.base_url = cloud.url
+
+        started = time.perf_counter()
+        await api.login()
+        device_list = await api.get_device_list()
+        setup_sec = time.perf_counter() - started
+        device_ids = [device["devId"] for device in device_list["data"]]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(device_id: str) -> None:
+            async with semaphore:
+                await api.get_device_detail(device_id)
+
+        async def refresh() -> None:
+            await asyncio.gather(
+                *(fetch(device_id) for device_id in device_ids),
+                return_exceptions=True,
+            )
+
+        before = cloud.requests["property"]
+        durations, elapsed = await _timed_rounds(rounds, refresh)
+        return summarize(
+            "client",
+            len(device_ids),
+            setup_sec,
+            durations,
+            cloud.requests["property"] - before,
+            elapsed,
+        )
+
+
+async def bench_coordinator(
+    cloud: MockJackeryCloud, rounds: int, concurrency: int
+) -> dict | None:
+    """Benchmark the account coordinator inside a bare Home Assistant core."""
+    try:
+        from homeassistant.config_entries import ConfigEntry
+        from homeassistant.core import HomeAssistant
+    except ImportError:
+        return None
+
+    sys.path.insert(0, REPO_ROOT)
+    # pylint: disable=import-outside-toplevel
+    from custom_components.jackery.api import AsyncJackeryAPI
+    from custom_components.jackery.const import (
+        CONF_MAX_CONCURRENT_REQUESTS,
+        CONF_MAX_POLL_INTERVAL,
+        CONF_MIN_POLL_INTERVAL,
+        DOMAIN,
+    )
+    from custom_components.jackery.coordinator import JackeryCoordinator
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        entry = ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title="bench@example.com",
+            data={},
+            source="user",
+            # Every device is due on every refresh
+            options={
+                CONF_MAX_CONCURRENT_REQUESTS: concurrency,
+                CONF_MIN_POLL_INTERVAL: 0,
+                CONF_MAX_POLL_INTERVAL: 0,
+            },
+        )
+        async with aiohttp.ClientSession() as session:
+            api = AsyncJackeryAPI(session, account=entry.title, password="bench")
+            api.base_url = cloud.url
+
+            started = time.perf_counter()
+            device_list = await api.get_device_list()
+            coordinator = JackeryCoordinator(hass, entry, api, device_list["data"])
+            await coordinator.async_refresh()
+            setup_sec = time.perf_counter() - started
+
+            before = cloud.requests["property"]
+            durations, elapsed = await _timed_rounds(rounds, coordinator.async_refresh)
+            result = summarize(
+                "coordinator",
+                len(coordinator.devices),
+                setup_sec,
+                durations,
+                cloud.requests["property"] - before,
+                elapsed,
+            )
+            await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+    return result
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    """Run every benchmark for every fleet size."""
+    results = []
+    for devices in args.devices:
+        for bench in (bench_client, bench_coordinator):
+            cloud = cloud_from_arguments(args, devices)
+            await cloud.start()
+            try:
+                result = await bench(cloud, args.rounds, args.concurrency)
+            finally:
+                await cloud.stop()
+            if result is None:
+                print(f"Skipping {bench.__name__}: Home Assistant is not installed")
+                continue
+            result["logins"] = cloud.requests["login"]
+            results.append(result)
+            print(json.dumps(result) if args.json else _format(result))
+    return results
+
+
+def _format(result: dict) -> str:
+    return (
+        f"{result['benchmark']:<12} devices={result['devices']:<4} "
+        f"setup={result['setup_ms']:>9.2f}ms "
+        f"p50={result['refresh_p50_ms']:>9.2f}ms "
+        f"p99={result['refresh_p99_ms']:>9.2f}ms "
+        f"req/s={result['requests_per_sec']:>8.1f} logins={result['logins']}"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Jackery cloud, used for benchmarking.
+
+Implements the three endpoints the integration talks to:
+
+- POST /v1/auth/login
+- GET  /v1/device/bind/list
+- GET  /v1/device/property
+
+The number of devices, response latency, token expiry (code 10402) and
+error injection are configurable. Run it standalone with
+
+    python benchmarks/mock_server.py --devices 50 --latency-ms 80
+
+and point a client at it by setting its base_url, or start it from a
+benchmark with MockJackeryCloud.start().
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+TOKEN_EXPIRED_CODE = 10402
+
+
+@dataclass
+class LatencyModel:
+    """Latency distribution applied to every response.
+
+    "fixed" always waits mean_ms, "uniform" waits between mean_ms - spread_ms
+    and mean_ms + spread_ms, and "lognormal" has median mean_ms with a long
+    tail controlled by sigma.
+    """
+
+    distribution: str = "fixed"
+    mean_ms: float = 0.0
+    spread_ms: float = 0.0
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        """Return a latency in seconds."""
+        if self.distribution == "uniform":
+            delay = rng.uniform(self.mean_ms - self.spread_ms, self.mean_ms + self.spread_ms)
+        elif self.distribution == "lognormal" and self.mean_ms > 0:
+            delay = rng.lognormvariate(0, self.sigma) * self.mean_ms
+        else:
+            delay = self.mean_ms
+        return max(delay, 0.0) / 1000
+
+
+@dataclass
+class MockJackeryCloud:
+    """An aiohttp application mimicking the Jackery cloud API.
+
+    token_ttl is the number of seconds a token stays valid, after which
+    requests using it are answered with code 10402. error_rate is the
+    fraction of device requests answered with an HTTP 500, api_error_rate
+    the fraction answered with a non-zero API code, and timeout_rate the
+    fraction that hang for hang_sec seconds.
+    """
+
+    devices: int = 1
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    login_latency: LatencyModel = field(default_factory=LatencyModel)
+    token_ttl: float | None = None
+    error_rate: float = 0.0
+    api_error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    hang_sec: float = 30.0
+    seed: int | None = None
+
+    def __post_init__(self) -> None:
+        """Build the device fleet and request counters."""
+        self._rng = random.Random(self.seed)
+        self.device_ids = [f"mock{index:05d}" for index in range(self.devices)]
+        self._tokens: dict[str, float] = {}
+        self.requests: Counter[str] = Counter()
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    def expire_tokens(self) -> None:
+        """Invalidate every issued token, as if they all timed out."""
+        self._tokens.clear()
+
+    def _token_valid(self, request: web.Request) -> bool:
+        issued_at = self._tokens.get(request.headers.get("token", ""))
+        if issued_at is None:
+            return False
+        return self.token_ttl is None or time.monotonic() - issued_at < self.token_ttl
+
+    async def _delay(self, latency: LatencyModel) -> None:
+        if delay := latency.sample(self._rng):
+            await asyncio.sleep(delay)
+
+    async def handle_login(self, request: web.Request) -> web.Response:
+        """Issue a new token for any well-formed login."""
+        self.requests["login"] += 1
+        await self._delay(self.login_latency)
+        if "aesEncryptData" not in request.query or "rsaForAesKey" not in request.query:
+            return web.json_response({"code": 10001, "msg": "Invalid login request"})
+        await request.read()
+        token = uuid.uuid4().hex
+        self._tokens[token] = time.monotonic()
+        return web.json_response({"code": 0, "msg": "success", "token": token})
+
+    async def handle_device_list(self, request: web.Request) -> web.Response:
+        """Return the bound devices."""
+        self.requests["bind_list"] += 1
+        await self._delay(self.latency)
+        if not self._token_valid(request):
+            self.requests["expired"] += 1
+            return web.json_response({"code": TOKEN_EXPIRED_CODE, "msg": "Token expired"})
+        return web.json_response(
+            {
+                "code": 0,
+                "msg": "success",
+                "data": [
+                    {
+                        "devId": device_id,
+                        "devName": f"Mock Explorer {index}",
+                        "productType": "E1000PRO" if index % 2 else "E2000PLUS",
+                    }
+                    for index, device_id in enumerate(self.device_ids)
+                ],
+            }
+        )
+
+    async def handle_property(self, request: web.Request) -> web.Response:
+        """Return a plausible property payload for one device."""
+        self.requests["property"] += 1
+        roll = self._rng.random()
+        if roll < self.timeout_rate:
+            self.requests["timeout"] += 1
+            await asyncio.sleep(self.hang_sec)
+        await self._delay(self.latency)
+        if not self._token_valid(request):
+            self.requests["expired"] += 1
+            return web.json_response({"code": TOKEN_EXPIRED_CODE, "msg": "Token expired"})
+        if roll < self.timeout_rate + self.error_rate:
+            self.requests["error"] += 1
+            return web.Response(status=500, text="Injected server error")
+        if roll < self.timeout_rate + self.error_rate + self.api_error_rate:
+            self.requests["api_error"] += 1
+            return web.json_response({"code": 500, "msg": "Injected API error"})
+        device_id = request.query.get("deviceId", "")
+        if device_id not in self.device_ids:
+            return web.json_response({"code": 10100, "msg": "Device not found"})
+        return web.json_response(
+            {"code": 0, "msg": "success", "data": {"properties": self._properties(device_id)}}
+        )
+
+    def _properties(self, device_id: str) -> dict:
+        """Generate a property payload; odd devices report split DC toggles."""
+        rng = self._rng
+        active = rng.random() < 0.5
+        properties = {
+            "rb": rng.randint(5, 100),
+            "bt": rng.randint(150, 350),
+            "op": rng.randint(10, 1500) if active else 0,
+            "ip": rng.randint(0, 800) if active else 0,
+            "acip": 0,
+            "it": rng.randint(0, 120),
+            "ot": rng.randint(0, 999),
+            "acov": 1200,
+            "oac": int(active),
+            "ec": 0,
+            "wss": rng.randint(-90, -30),
+        }
+        if int(device_id[-1]) % 2:
+            properties["odcc"] = 0
+            properties["odcu"] = int(active)
+        else:
+            properties["odc"] = int(active)
+        return properties
+
+    def app(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application()
+        app.router.add_post("/v1/auth/login", self.handle_login)
+        app.router.add_get("/v1/device/bind/list", self.handle_device_list)
+        app.router.add_get("/v1/device/property", self.handle_property)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sockets = site._server.sockets  # pylint: disable=protected-access
+        self.url = f"http://{host}:{sockets[0].getsockname()[1]}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the mock cloud options to an argument parser."""
+    parser.add_argument("--latency", default="fixed", choices=("fixed", "uniform", "lognormal"))
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--spread-ms", type=float, default=0.0)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--login-latency-ms", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=float, default=None, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--api-error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def cloud_from_arguments(args: argparse.Namespace, devices: int) -> MockJackeryCloud:
+    """Build a mock cloud from parsed arguments."""
+    return MockJackeryCloud(
+        devices=devices,
+        latency=LatencyModel(args.latency, args.latency_ms, args.spread_ms, args.sigma),
+        login_latency=LatencyModel("fixed", args.login_latency_ms),
+        token_ttl=args.token_ttl,
+        error_rate=args.error_rate,
+        api_error_rate=args.api_error_rate,
+        timeout_rate=args.timeout_rate,
+        seed=args.seed,
+    )
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    cloud = cloud_from_arguments(args, args.devices)
+    url = await cloud.start(args.host, args.port)
+    print(f"Mock Jackery cloud with {args.devices} devices listening on {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await cloud.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_server_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
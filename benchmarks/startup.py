@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Cold start benchmark of the integration against the local mock cloud.
+
+Measures
+
+- import: the time to import the integration and its platforms in a fresh
+  interpreter that already loaded the Home Assistant modules it builds on,
+  as Home Assistant has by the time it loads a custom integration
+- setup: async_setup_entry through the config entries manager, and the time
+  until every device has live data from the background first refresh
+
+The import time is checked against a budget; the script exits with status 1
+when the median exceeds it.
+
+    python benchmarks/startup.py --devices 1 50 500 --budget-ms 25
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_server import MockJackeryCloud, add_server_arguments, cloud_from_arguments
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPONENT_DIR = os.path.join(REPO_ROOT, "custom_components", "jackery")
+
+# Median import time the integration has to stay under, in milliseconds
+DEFAULT_IMPORT_BUDGET_MS = 25.0
+
+# Loaded by Home Assistant before any custom integration
+PRELOADED_MODULES = (
+    "aiohttp",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.diagnostics",
+    "homeassistant.components.sensor",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+)
+
+INTEGRATION_MODULES = (
+    "custom_components.jackery",
+    "custom_components.jackery.binary_sensor",
+    "custom_components.jackery.config_flow",
+    "custom_components.jackery.diagnostics",
+    "custom_components.jackery.sensor",
+)
+
+IMPORT_SCRIPT = """
+import importlib, json, sys, time
+for module in {preloaded!r}:
+    importlib.import_module(module)
+before = set(sys.modules)
+started = time.perf_counter()
+for module in {modules!r}:
+    importlib.import_module(module)
+elapsed = time.perf_counter() - started
+loaded = sorted(set(sys.modules) - before)
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "modules": len(loaded),
+    "third_party": sorted(
+        {{name.split(".")[0] for name in loaded}} - {{"custom_components"}}
+    ),
+}}))
+"""
+
+
+def measure_import(runs: int) -> dict:
+    """Import the integration in fresh interpreters and return the median."""
+    script = IMPORT_SCRIPT.format(
+        preloaded=PRELOADED_MODULES, modules=INTEGRATION_MODULES
+    )
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=REPO_ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(json.loads(output))
+    return {
+        "benchmark": "import",
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 2),
+        "modules": samples[-1]["modules"],
+        "third_party": samples[-1]["third_party"],
+    }
+
+
+async def measure_setup(cloud: MockJackeryCloud, timeout: float) -> dict:
+    """Set up a config entry in a bare Home Assistant and time it."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant import bootstrap, config_entries, loader
+    from homeassistant.core import HomeAssistant
+
+    sys.path.insert(0, REPO_ROOT)
+    from custom_components.jackery import api
+    from custom_components.jackery.const import CONF_MAX_REQUESTS_PER_SEC, DOMAIN
+
+    # Every client created by the integration talks to the mock cloud
+    api.BASE_URL = cloud.url
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.mkdir(os.path.join(config_dir, "custom_components"))
+        os.symlink(COMPONENT_DIR, os.path.join(config_dir, "custom_components", DOMAIN))
+        hass = HomeAssistant(config_dir)
+        hass.config.skip_pip = True
+        loader.async_setup(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await bootstrap.async_load_base_functionality(hass)
+
+        entry = config_entries.ConfigEntry(
+            version=1,
+            minor_version=1,
+            domain=DOMAIN,
+            title="startup@example.com",
+            data={"username": "startup@example.com", "password": "startup"},
+            source="user",
+            # Measure the cloud round trips, not the shared request budget
+            options={CONF_MAX_REQUESTS_PER_SEC: 10_000},
+        )
+        started = time.perf_counter()
+        await hass.config_entries.async_add(entry)
+        setup_sec = time.perf_counter() - started
+
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        deadline = started + timeout
+        while len(coordinator.data or {}) < cloud.devices:
+            if time.perf_counter() > deadline:
+                break
+            await asyncio.sleep(0.001)
+        live_sec = time.perf_counter() - started
+        live_devices = len(coordinator.data or {})
+
+        await hass.async_stop(force=True)
+
+    return {
+        "benchmark": "setup",
+        "devices": cloud.devices,
+        "setup_entry_ms": round(setup_sec * 1000, 2),
+        "first_data_ms": round(live_sec * 1000, 2),
+        "live_devices": live_devices,
+        "state": str(entry.state),
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    """Run the setup benchmark for every fleet size."""
+    results = []
+    for devices in args.devices:
+        cloud = cloud_from_arguments(args, devices)
+        await cloud.start()
+        try:
+            result = await measure_setup(cloud, args.timeout)
+        finally:
+            await cloud.stop()
+        results.append(result)
+        print(
+            json.dumps(result)
+            if args.json
+            else (
+                f"setup   devices={result['devices']:<4} "
+                f"async_setup_entry={result['setup_entry_ms']:>9.2f}ms "
+                f"first data={result['first_data_ms']:>9.2f}ms "
+                f"({result['live_devices']} live)"
+            )
+        )
+    return results
+
+
+def main() -> None:
+    """Parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--import-runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds")
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    try:
+        import homeassistant  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
+    except ImportError:
+        print("Home Assistant is not installed")
+        sys.exit(2)
+
+    result = measure_import(args.import_runs)
+    result["budget_ms"] = args.budget_ms
+    print(
+        json.dumps(result)
+        if args.json
+        else (
+            f"import  {result['import_ms']:.2f}ms (budget {args.budget_ms}ms), "
+            f"{result['modules']} modules, new packages: "
+            f"{', '.join(result['third_party']) or 'none'}"
+        )
+    )
+    asyncio.run(run(args))
+    if result["import_ms"] > args.budget_ms:
+        print(f"Import time exceeds the budget of {args.budget_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,25 @@ from __future__ import annotations
 import logging
 from datetime import timedelta
 
-import async_timeout
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-    UpdateFailed,
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    CONF_ENDPOINTS,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_REQUESTS_PER_SEC,
+    DATA_REGISTRY,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_MAX_REQUESTS_PER_SEC,
+    DEVICE_DISCOVERY_INTERVAL_SEC,
+    DOMAIN,
 )
-from homeassistant.util import dt as dt_util
-
-from .api import JackeryAPI, JackeryAuthenticationError
-from .const import DOMAIN, POLLING_INTERVAL_SEC
+from .coordinator import JackeryCoordinator
+from .registry import async_get_registry
+from .services import async_setup_services
+from .store import JackerySnapshotStore, async_get_token_store
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR]
 _LOGGER = logging.getLogger(__name__)
@@ -26,75 +33,101 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Jackery integration."""
     # For config flow based integrations, this function should return True
     # to allow the integration to be discovered and configured via the UI
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Jackery from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
+    # Accounts share one transport, login cipher and request budget
+    registry = async_get_registry(hass)
+    api = registry.async_create_client(
+        entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD]
+    )
+    # Reuse the token from the config flow or the previous run; the client
+    # only logs in again once the cloud reports it expired
+    token_store = await async_get_token_store(hass)
+    token_store.async_restore(
+        api, entry.options.get(CONF_ENDPOINTS) or [api.default_base_url]
+    )
 
-    api = JackeryAPI(
-        account=entry.data[CONF_USERNAME],
-        password=entry.data[CONF_PASSWORD],
+    registry.async_register(
+        entry.entry_id,
+        api,
+        entry.options.get(CONF_MAX_REQUESTS_PER_SEC, DEFAULT_MAX_REQUESTS_PER_SEC),
     )
 
-    try:
-        # Get the list of devices to set up coordinators for each one
-        device_list_response = await hass.async_add_executor_job(api.get_device_list)
-        devices = device_list_response.get("data", [])
-        if not devices:
-            _LOGGER.warning("No Jackery devices found for this account.")
-            return False
-    except JackeryAuthenticationError as err:
-        _LOGGER.error("Authentication failed while fetching device list: %s", err)
-        return False
-    except Exception as err:
-        _LOGGER.error("Failed to fetch device list: %s", err)
-        return False
-
-    coordinators = {}
-    for device in devices:
-        device_id = device["devId"]
-        device_name = device.get("devName", f"Jackery Device {device_id}")
-
-        async def _async_update_data(api_client=api, dev_id=device_id):
-            """Fetch data from API endpoint."""
-            try:
-                async with async_timeout.timeout(10):
-                    data = await hass.async_add_executor_job(
-                        api_client.get_device_detail, dev_id
-                    )
-                    properties = data.get("data", {}).get("properties", {})
-                    properties["last_updated"] = dt_util.now()
-                    return properties
-            except JackeryAuthenticationError as err:
-                raise UpdateFailed(f"Authentication error: {err}")
-            except Exception as err:
-                raise UpdateFailed(f"Error communicating with API: {err}")
-
-        coordinator = DataUpdateCoordinator(
-            hass,
-            _LOGGER,
-            name=f"Jackery {device_name}",
-            update_method=_async_update_data,
-            update_interval=timedelta(seconds=POLLING_INTERVAL_SEC),
+    # Start from the devices and values saved by the previous run; nothing
+    # waits on the cloud before the platforms are set up
+    coordinator = JackeryCoordinator(hass, entry, api, [], registry.limiter)
+    snapshot_store = JackerySnapshotStore(hass, entry.entry_id)
+    if cache := await snapshot_store.async_load():
+        coordinator.async_restore(cache)
+    entry.async_on_unload(
+        coordinator.async_add_listener(
+            lambda: snapshot_store.async_schedule_save(coordinator.async_cache_data)
         )
-        await coordinator.async_config_entry_first_refresh()
-        coordinators[device_id] = coordinator
+    )
 
     hass.data[DOMAIN][entry.entry_id] = {
-        "coordinators": coordinators,
-        "devices": devices,
+        "coordinator": coordinator,
     }
 
+    # Pick up bound and unbound devices without reloading the entry
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            coordinator.async_discover_devices,
+            timedelta(seconds=DEVICE_DISCOVERY_INTERVAL_SEC),
+        )
+    )
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # The device list and first poll of every device run concurrently in
+    # the background; restored entities update once they complete
+    entry.async_create_background_task(
+        hass, coordinator.async_start(), f"{DOMAIN} first refresh {entry.title}"
+    )
+
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator."""
+    coordinator: JackeryCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    import_statistics = entry.options.get(
+        CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS
+    )
+    if import_statistics != (coordinator.statistics is not None):
+        # The sensors' state classes depend on it, so the entities are rebuilt
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    coordinator.async_apply_options(entry.options)
+    await coordinator.async_request_refresh()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        await _async_release_registry(hass, entry)
 
     return unload_ok
+
+
+async def _async_release_registry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Release an entry's shared resources and drop the registry when unused."""
+    registry = async_get_registry(hass)
+    if await registry.async_release(entry.entry_id):
+        hass.data[DOMAIN].pop(DATA_REGISTRY)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the stored token and snapshot when a config entry is removed."""
+    token_store = await async_get_token_store(hass)
+    token_store.async_remove_token(entry.data[CONF_USERNAME])
+    await JackerySnapshotStore(hass, entry.entry_id).async_remove()
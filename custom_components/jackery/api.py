@@ -1,39 +1,293 @@
 """API client for Jackery cloud services."""
 
+import asyncio
 import base64
+import bisect
+import contextlib
+import functools
 import hashlib
+import importlib.util
 import json
 import logging
+import time
 import uuid
+from collections.abc import Awaitable, Callable
 from typing import Optional
 
-import requests
-from Cryptodome.Cipher import AES, PKCS1_v1_5
-from Cryptodome.PublicKey import RSA
-from Cryptodome.Util.Padding import pad
+import aiohttp
 
 _LOGGER = logging.getLogger(__name__)
 
+BASE_URL = "https://iot.jackeryapp.com"
+LOGIN_PATH = "/v1/auth/login"
+DEVICE_LIST_PATH = "/v1/device/bind/list"
+DEVICE_PROPERTY_PATH = "/v1/device/property"
+
+# Timeout for a single HTTP request to the Jackery cloud
+REQUEST_TIMEOUT_SEC = 10
+
+# A hedged request is only sent once the endpoint has this many samples, so
+# the p95 delay it waits for is meaningful
+HEDGE_MIN_SAMPLES = 20
+
+# Error code returned by the cloud when the token is no longer valid
+TOKEN_EXPIRED_CODE = 10402
+
+RSA_PUBLIC_KEY_B64 = "MIGfMA0GCSqGSIb3DQEBAQUAA4GNADCBiQKBgQCVmzgJy/4XolxPnkfu32YtJqYGFLYqf9/rnVgURJED+8J9J3Pccd6+9L97/+7COZE5OkejsgOkqeLNC9C3r5mhpE4zk/HStss7Q8/5DqkGD1annQ+eoICo3oi0dITZ0Qll56Dowb8lXi6WHViVDdih/oeUwVJY89uJNtTWrz7t7QIDAQAB"
+AES_KEY = b"1234567890123456"
+
+# Upper bounds of the request latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _accept_encoding() -> str:
+    """Return the encodings we can actually decode.
+
+    Brotli is only advertised when a decoder is installed, otherwise a br
+    response from the cloud could not be read by either HTTP library.
+    """
+    if any(
+        importlib.util.find_spec(module) for module in ("brotli", "brotlicffi")
+    ):
+        return "br;q=1.0, gzip;q=0.9, deflate;q=0.8"
+    return "gzip;q=1.0, deflate;q=0.8"
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+LOGIN_HEADERS = {
+    "app_version": "1.0.5",
+    "upload-incomplete": "?0",
+    "sys_version": "17.2",
+    "platform": "1",
+    "upload-draft-interop-version": "3",
+    "accept": "*/*",
+    "accept-language": "en-US",
+    "accept-encoding": ACCEPT_ENCODING,
+    "User-Agent": "DxPowerProject/1.0.5 (com.hb.jackery; build:2; iOS 17.2.0) Alamofire/5.8.0",
+    "model": "iPad Pro (12.9-inch) (3rd generation)",
+}
+
+REQUEST_HEADERS = {
+    "content-type": "application/json",
+    "accept": "*/*",
+    "app_version": "1.0.5",
+    "sys_version": "17.2",
+    "accept-encoding": ACCEPT_ENCODING,
+    "accept-language": "en-US",
+    "platform": "1",
+    "user-agent": "DxPowerProject/1.0.5 (com.hb.jackery; build:2; iOS 17.2.0) Alamofire/5.8.0",
+    "model": "iPad Pro (12.9-inch) (3rd generation)",
+}
+
 
 class JackeryAuthenticationError(Exception):
     """Exception to indicate an authentication error."""
 
 
-class JackeryAPI:
-    """A client to interact with the Jackery Cloud API."""
+class JackeryAPIError(Exception):
+    """Exception to indicate the cloud returned an error code."""
+
+
+class EndpointStats:
+    """Latency histogram and outcome counts for one endpoint."""
+
+    __slots__ = ("buckets", "errors", "max_ms", "successes", "timeouts", "total_ms")
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        # One bucket per LATENCY_BUCKETS_MS bound plus one for slower requests
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.successes = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @property
+    def count(self) -> int:
+        """Return the number of recorded requests."""
+        return self.successes + self.errors + self.timeouts
+
+    def record(self, duration_ms: float, outcome: str) -> None:
+        """Record one request; outcome is success, error or timeout."""
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        if outcome == "success":
+            self.successes += 1
+        elif outcome == "timeout":
+            self.timeouts += 1
+        else:
+            self.errors += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Estimate a latency percentile as the upper bound of its bucket."""
+        count = self.count
+        if not count:
+            return None
+        rank = pct / 100 * count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return float(LATENCY_BUCKETS_MS[index])
+                break
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        """Return the statistics in a serializable form."""
+        return {
+            "count": self.count,
+            "successes": self.successes,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "max_ms": round(self.max_ms, 1),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "histogram_ms": {
+                **{
+                    f"<={bound}": bucket
+                    for bound, bucket in zip(LATENCY_BUCKETS_MS, self.buckets)
+                },
+                f">{LATENCY_BUCKETS_MS[-1]}": self.buckets[-1],
+            },
+        }
+
+
+class RequestStats:
+    """Per-endpoint request statistics of a client."""
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.endpoints: dict[str, EndpointStats] = {}
+        # Requests answered with TOKEN_EXPIRED_CODE, each followed by a re-login
+        self.token_expired = 0
+        # Duplicate requests sent after the p95 delay, and how many of them
+        # answered before the original
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def endpoint(self, path: str) -> EndpointStats:
+        """Return the statistics of an endpoint."""
+        if (stats := self.endpoints.get(path)) is None:
+            stats = self.endpoints[path] = EndpointStats()
+        return stats
+
+    def record(self, path: str, started: float, outcome: str) -> None:
+        """Record a request to path that started at the monotonic time started."""
+        self.endpoint(path).record((time.monotonic() - started) * 1000, outcome)
+
+    def total(self, attribute: str) -> int:
+        """Return the sum of a counter over all endpoints."""
+        return sum(getattr(stats, attribute) for stats in self.endpoints.values())
+
+    def as_dict(self) -> dict:
+        """Return the statistics in a serializable form."""
+        return {
+            "token_expired": self.token_expired,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "endpoints": {
+                path: stats.as_dict() for path, stats in self.endpoints.items()
+            },
+        }
+
+
+class JackeryLoginCipher:
+    """The RSA and AES primitives of the login envelope.
+
+    The public key is parsed on first use and kept, so one instance can be
+    shared by every client in the process. Cryptodome is only imported when
+    a login is encrypted, not when Home Assistant loads the integration.
+    """
 
     def __init__(
-        self, account: str, password: str, android_id: str = "abcd1234567890ef"
+        self, public_key_b64: str = RSA_PUBLIC_KEY_B64, aes_key: bytes = AES_KEY
+    ):
+        """Initialize the cipher."""
+        self.public_key_b64 = public_key_b64
+        self.aes_key = aes_key
+
+    @functools.cached_property
+    def _rsa_cipher(self):
+        """Parse the public key once."""
+        from Cryptodome.Cipher import PKCS1_v1_5
+        from Cryptodome.PublicKey import RSA
+
+        pub_key_pem = (
+            f"-----BEGIN PUBLIC KEY-----\n{self.public_key_b64}\n-----END PUBLIC KEY-----"
+        )
+        return PKCS1_v1_5.new(RSA.importKey(pub_key_pem))
+
+    def encrypt_with_aes(self, plain_text: str) -> str:
+        """Perform AES encryption."""
+        from Cryptodome.Cipher import AES
+        from Cryptodome.Util.Padding import pad
+
+        cipher = AES.new(self.aes_key, AES.MODE_ECB)
+        encrypted = cipher.encrypt(pad(plain_text.encode("utf-8"), AES.block_size))
+        return base64.b64encode(encrypted).decode("utf-8")
+
+    def encrypt_with_rsa(self, data: bytes) -> str:
+        """Perform RSA encryption."""
+        encrypted = self._rsa_cipher.encrypt(data)
+        return base64.b64encode(encrypted).decode("utf-8")
+
+
+class _JackeryClientBase:
+    """Shared state and request building for the Jackery clients."""
+
+    def __init__(
+        self,
+        account: str,
+        password: str,
+        android_id: str = "abcd1234567890ef",
+        cipher: Optional[JackeryLoginCipher] = None,
     ):
         """Initialize the API client."""
         self.account = account
         self.password = password
         self.android_id = android_id
-        self.base_url = "https://iot.jackeryapp.com"
+        self._cipher = cipher or JackeryLoginCipher()
+        # Used unless regional endpoints are configured
+        self.default_base_url = BASE_URL
+        self.base_url = BASE_URL
         self._token: Optional[str] = None
-        self._token_expiry_time: float = (
-            0  # We will assume a long expiry for simplicity
-        )
+        # The cloud does not report an expiry; a token stays valid until a
+        # request comes back with TOKEN_EXPIRED_CODE
+        self.token_issued_at: float = 0
+        self._token_listener: Optional[Callable[[str, float], None]] = None
+        self._headers = REQUEST_HEADERS
+        # The AES-encrypted login bean and the credentials it was built from
+        self._login_bean_cache: Optional[tuple[tuple[str, str, str], str]] = None
+
+    @property
+    def token(self) -> Optional[str]:
+        """Return the current auth token, if any."""
+        return self._token
+
+    def set_token(self, token: str, issued_at: float) -> None:
+        """Reuse a token obtained earlier instead of logging in again."""
+        self._token = token
+        self.token_issued_at = issued_at
+        self._headers = {**REQUEST_HEADERS, "token": token}
+
+    def set_base_url(self, base_url: str) -> None:
+        """Switch to another endpoint, dropping the token issued by the old one."""
+        if base_url == self.base_url:
+            return
+        self.base_url = base_url
+        self._token = None
+        self._headers = REQUEST_HEADERS
+
+    def set_token_listener(
+        self, listener: Optional[Callable[[str, float], None]]
+    ) -> None:
+        """Register a callback invoked with every newly issued token."""
+        self._token_listener = listener
 
     def _name_uuid_from_bytes_java(self, data: bytes) -> str:
         """Generate a version 3 UUID using an MD5 hash."""
@@ -51,25 +305,16 @@ class JackeryAPI:
             random_uuid_str = str(uuid.uuid4()).replace("-", "")
             return "9" + random_uuid_str
 
-    def _encrypt_with_aes(self, plain_text: str, aes_key: bytes) -> str:
-        """Perform AES encryption."""
-        cipher = AES.new(aes_key, AES.MODE_ECB)
-        encrypted = cipher.encrypt(pad(plain_text.encode("utf-8"), AES.block_size))
-        return base64.b64encode(encrypted).decode("utf-8")
+    def _encrypted_login_bean(self) -> str:
+        """Return the AES-encrypted login bean of the account.
 
-    def _encrypt_with_rsa(self, data: bytes, public_key_b64: str) -> str:
-        """Perform RSA encryption."""
-        pub_key_pem = (
-            f"-----BEGIN PUBLIC KEY-----\n{public_key_b64}\n-----END PUBLIC KEY-----"
-        )
-        pub_key = RSA.importKey(pub_key_pem)
-        cipher = PKCS1_v1_5.new(pub_key)
-        encrypted = cipher.encrypt(data)
-        return base64.b64encode(encrypted).decode("utf-8")
+        It only changes with the credentials, so it is encrypted once and
+        reused by every login unless the UDID is random.
+        """
+        key = (self.account, self.password, self.android_id)
+        if self._login_bean_cache and self._login_bean_cache[0] == key:
+            return self._login_bean_cache[1]
 
-    def login(self) -> bool:
-        """Perform the login process and store the token."""
-        _LOGGER.info("Attempting to login to Jackery service")
         mac_id = self._generate_udid()
         login_bean = {
             "account": self.account,
@@ -81,74 +326,112 @@ class JackeryAPI:
             "verificationCode": "",
         }
 
-        public_key_b64 = "MIGfMA0GCSqGSIb3DQEBAQUAA4GNADCBiQKBgQCVmzgJy/4XolxPnkfu32YtJqYGFLYqf9/rnVgURJED+8J9J3Pccd6+9L97/+7COZE5OkejsgOkqeLNC9C3r5mhpE4zk/HStss7Q8/5DqkGD1annQ+eoICo3oi0dITZ0Qll56Dowb8lXi6WHViVDdih/oeUwVJY89uJNtTWrz7t7QIDAQAB"
-        aes_key = b"1234567890123456"
         login_bean_json = json.dumps(login_bean, ensure_ascii=False)
-        aes_encrypt_data = self._encrypt_with_aes(login_bean_json, aes_key)
-        rsa_for_aes_key = self._encrypt_with_rsa(aes_key, public_key_b64)
-
-        url = f"{self.base_url}/v1/auth/login"
-        params = {"aesEncryptData": aes_encrypt_data, "rsaForAesKey": rsa_for_aes_key}
-        headers = {
-            "app_version": "1.0.5",
-            "upload-incomplete": "?0",
-            "sys_version": "17.2",
-            "platform": "1",
-            "upload-draft-interop-version": "3",
-            "accept": "*/*",
-            "accept-language": "en-US",
-            "accept-encoding": "br;q=1.0, gzip;q=0.9, deflate;q=0.8",
-            "User-Agent": "DxPowerProject/1.0.5 (com.hb.jackery; build:2; iOS 17.2.0) Alamofire/5.8.0",
-            "model": "iPad Pro (12.9-inch) (3rd generation)",
+        aes_encrypt_data = self._cipher.encrypt_with_aes(login_bean_json)
+        if mac_id.startswith("2"):
+            # Derived from the Android ID rather than random
+            self._login_bean_cache = (key, aes_encrypt_data)
+        return aes_encrypt_data
+
+    def _login_params(self) -> dict:
+        """Build the encrypted query parameters for the login request.
+
+        Only the RSA encryption of the AES key is done on every login, as
+        its PKCS#1 v1.5 padding has to be random.
+        """
+        return {
+            "aesEncryptData": self._encrypted_login_bean(),
+            "rsaForAesKey": self._cipher.encrypt_with_rsa(self._cipher.aes_key),
         }
+
+    def _handle_login_response(self, data: dict) -> bool:
+        """Store the token from a login response or raise on failure."""
+        _LOGGER.debug("Login response data: %s", data)
+
+        if data.get("code") == 0 and "token" in data:
+            self.set_token(data["token"], time.time())
+            _LOGGER.info("Successfully logged in and obtained token.")
+            if self._token_listener:
+                self._token_listener(self._token, self.token_issued_at)
+            return True
+        else:
+            error_msg = f"Login failed: {data.get('msg', 'Unknown error')} (code: {data.get('code')})"
+            _LOGGER.error(error_msg)
+            raise JackeryAuthenticationError(data.get("msg", "Login failed"))
+
+    def _request_headers(self) -> dict:
+        """Return the headers for an authenticated request."""
+        # Built once per token by set_token
+        return self._headers
+
+    def _check_response(self, data: dict) -> dict:
+        """Raise if an API response carries an error code."""
+        if data.get("code") != 0:
+            error_msg = f"API Error: {data.get('msg', 'Unknown error')} (code: {data.get('code')})"
+            _LOGGER.error(error_msg)
+            raise JackeryAPIError(error_msg)
+
+        return data
+
+
+class JackeryAPI(_JackeryClientBase):
+    """A blocking client to interact with the Jackery Cloud API.
+
+    Used by the standalone debugging script; Home Assistant uses
+    AsyncJackeryAPI instead, so requests is only imported here.
+    """
+
+    def __init__(
+        self, account: str, password: str, android_id: str = "abcd1234567890ef"
+    ):
+        """Initialize the API client."""
+        import requests
+
+        super().__init__(account, password, android_id)
+        # Reuse connections between requests instead of a new TLS handshake each time
+        self._session = requests.Session()
+
+    def login(self) -> bool:
+        """Perform the login process and store the token."""
+        import requests
+
+        _LOGGER.info("Attempting to login to Jackery service")
+        url = f"{self.base_url}{LOGIN_PATH}"
         files = {"file": ("", b"", "")}
 
         try:
-            response = requests.post(
-                url, params=params, headers=headers, files=files, timeout=10
+            response = self._session.post(
+                url,
+                params=self._login_params(),
+                headers=LOGIN_HEADERS,
+                files=files,
+                timeout=REQUEST_TIMEOUT_SEC,
             )
             _LOGGER.debug("Login response status: %s", response.status_code)
             response.raise_for_status()
-            data = response.json()
-            _LOGGER.debug("Login response data: %s", data)
-
-            if data.get("code") == 0 and "token" in data:
-                self._token = data["token"]
-                _LOGGER.info("Successfully logged in and obtained token.")
-                return True
-            else:
-                error_msg = f"Login failed: {data.get('msg', 'Unknown error')} (code: {data.get('code')})"
-                _LOGGER.error(error_msg)
-                raise JackeryAuthenticationError(data.get("msg", "Login failed"))
+            return self._handle_login_response(response.json())
         except requests.RequestException as e:
             _LOGGER.error("Login request failed: %s", e)
             raise JackeryAuthenticationError(f"Request failed: {e}") from e
 
     def _get_request(self, url_path: str, params: Optional[dict] = None) -> dict:
         """Make a GET request to the API, handling token expiry."""
+        import requests
+
         if not self._token:
             _LOGGER.info("No token found, logging in.")
             if not self.login():
                 raise JackeryAuthenticationError("Unable to login to retrieve token.")
 
-        headers = {
-            "content-type": "application/json",
-            "accept": "*/*",
-            "app_version": "1.0.5",
-            "sys_version": "17.2",
-            "accept-encoding": "br;q=1.0, gzip;q=0.9, deflate;q=0.8",
-            "accept-language": "en-US",
-            "platform": "1",
-            "user-agent": "DxPowerProject/1.0.5 (com.hb.jackery; build:2; iOS 17.2.0) Alamofire/5.8.0",
-            "model": "iPad Pro (12.9-inch) (3rd generation)",
-            "token": self._token,
-        }
         full_url = f"{self.base_url}{url_path}"
         _LOGGER.debug("Making API request to: %s", full_url)
 
         try:
-            response = requests.get(
-                full_url, headers=headers, params=params, timeout=10
+            response = self._session.get(
+                full_url,
+                headers=self._request_headers(),
+                params=params,
+                timeout=REQUEST_TIMEOUT_SEC,
             )
             _LOGGER.debug("API response status: %s", response.status_code)
             response.raise_for_status()
@@ -156,26 +439,23 @@ class JackeryAPI:
             _LOGGER.debug("API response data: %s", data)
 
             # Check for expired token (code=10402)
-            if data.get("code") == 10402:
+            if data.get("code") == TOKEN_EXPIRED_CODE:
                 _LOGGER.info("Token expired. Re-logging in...")
                 if not self.login():
                     raise JackeryAuthenticationError(
                         "Failed to re-login after token expired."
                     )
                 # Retry the request with the new token
-                headers["token"] = self._token
-                response = requests.get(
-                    full_url, headers=headers, params=params, timeout=10
+                response = self._session.get(
+                    full_url,
+                    headers=self._request_headers(),
+                    params=params,
+                    timeout=REQUEST_TIMEOUT_SEC,
                 )
                 response.raise_for_status()
                 data = response.json()
 
-            if data.get("code") != 0:
-                error_msg = f"API Error: {data.get('msg', 'Unknown error')} (code: {data.get('code')})"
-                _LOGGER.error(error_msg)
-                raise Exception(error_msg)
-
-            return data
+            return self._check_response(data)
 
         except requests.RequestException as e:
             _LOGGER.error("API request failed: %s", e)
@@ -185,7 +465,7 @@ class JackeryAPI:
         """Get the list of devices."""
         _LOGGER.info("Attempting to fetch device list from Jackery API")
         try:
-            result = self._get_request("/v1/device/bind/list")
+            result = self._get_request(DEVICE_LIST_PATH)
             _LOGGER.info("Successfully retrieved device list")
             return result
         except Exception as e:
@@ -194,4 +474,355 @@ class JackeryAPI:
 
     def get_device_detail(self, device_id: str) -> dict:
         """Get detailed information for a specified device."""
-        return self._get_request("/v1/device/property", params={"deviceId": device_id})
+        return self._get_request(DEVICE_PROPERTY_PATH, params={"deviceId": device_id})
+
+
+class AsyncJackeryAPI(_JackeryClientBase):
+    """An asyncio client to interact with the Jackery Cloud API.
+
+    All requests go through the aiohttp session passed in, so connections
+    are pooled and kept alive between polls. Home Assistant passes its
+    shared client session.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        account: str,
+        password: str,
+        android_id: str = "abcd1234567890ef",
+        cipher: Optional[JackeryLoginCipher] = None,
+    ):
+        """Initialize the API client."""
+        super().__init__(account, password, android_id, cipher)
+        self._session = session
+        self.request_timeout: float = REQUEST_TIMEOUT_SEC
+        self._timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SEC)
+        # Only one login may be in flight; concurrent requests that need a
+        # new token wait for it and reuse the result
+        self._login_task: Optional[asyncio.Task] = None
+        self.login_count = 0
+        self.logins_avoided = 0
+        self.stats = RequestStats()
+        # Called with a phase name and its duration in seconds while the
+        # poll pipeline is being profiled
+        self.phase_listener: Optional[Callable[[str, float], None]] = None
+        # Awaited with the deadline before a hedged or retried request is
+        # sent; returns False if the request may not be sent in time
+        self.request_gate: Optional[
+            Callable[[Optional[float]], Awaitable[bool]]
+        ] = None
+
+    def _login_done(self, task: asyncio.Task) -> None:
+        """Clear the in-flight login once it finished."""
+        self._login_task = None
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter was cancelled
+            task.exception()
+
+    async def async_close(self) -> None:
+        """Cancel a login still in flight."""
+        if self._login_task is not None:
+            self._login_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self._login_task
+
+    def set_request_timeout(self, seconds: float) -> None:
+        """Change the timeout of single requests."""
+        self.request_timeout = seconds
+        self._timeout = aiohttp.ClientTimeout(total=seconds)
+
+    async def probe(self, base_url: str, samples: int) -> Optional[float]:
+        """Return the round-trip time to an endpoint in ms, None if unreachable.
+
+        Sends unauthenticated requests to the root of the endpoint; any HTTP
+        response counts as reachable. The first sample includes the TCP and
+        TLS handshake, so the fastest sample is reported.
+        """
+        fastest: Optional[float] = None
+        for _ in range(samples):
+            started = time.monotonic()
+            try:
+                async with self._session.get(
+                    f"{base_url}/", timeout=self._timeout, allow_redirects=False
+                ) as response:
+                    await response.read()
+            except (aiohttp.ClientError, TimeoutError) as err:
+                _LOGGER.debug("Endpoint %s is unreachable: %s", base_url, err)
+                return None
+            elapsed = (time.monotonic() - started) * 1000
+            if fastest is None or elapsed < fastest:
+                fastest = elapsed
+        return fastest
+
+    def _timeout_until(self, deadline: Optional[float]) -> aiohttp.ClientTimeout:
+        """Return the request timeout that fits in the remaining budget.
+
+        Raises TimeoutError if the monotonic deadline has already passed.
+        """
+        if deadline is None:
+            return self._timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Request deadline exceeded")
+        return aiohttp.ClientTimeout(total=min(self.request_timeout, remaining))
+
+    async def _async_relogin(
+        self, stale_token: Optional[str], deadline: Optional[float] = None
+    ) -> None:
+        """Replace a missing or expired token with exactly one login.
+
+        Requests rejected with a token that has since been replaced retry
+        straight away, and requests arriving while a login is in flight
+        wait for that login instead of starting their own. A caller with a
+        deadline stops waiting when it passes; the login itself carries on
+        for the other requests.
+        """
+        if self._token and self._token != stale_token:
+            self.logins_avoided += 1
+            _LOGGER.debug("Token was refreshed by a concurrent request")
+            return
+
+        if self._login_task is None:
+            self.login_count += 1
+            self._login_task = asyncio.ensure_future(self.login())
+            self._login_task.add_done_callback(self._login_done)
+        else:
+            self.logins_avoided += 1
+            _LOGGER.debug("Waiting for the login already in flight")
+
+        # Shielded so a cancelled caller does not abort the login for others
+        login = asyncio.shield(self._login_task)
+        if deadline is not None:
+            login = asyncio.wait_for(login, self._timeout_until(deadline).total)
+        if not await login:
+            raise JackeryAuthenticationError("Unable to login to retrieve token.")
+
+    async def login(self) -> bool:
+        """Perform the login process and store the token."""
+        _LOGGER.info("Attempting to login to Jackery service")
+        url = f"{self.base_url}{LOGIN_PATH}"
+        form = aiohttp.FormData()
+        form.add_field("file", b"", filename="")
+
+        started = time.monotonic()
+        params = self._login_params()
+        if self.phase_listener is not None:
+            self.phase_listener("login_crypto", time.monotonic() - started)
+        try:
+            async with self._session.post(
+                url,
+                params=params,
+                headers=LOGIN_HEADERS,
+                data=form,
+                timeout=self._timeout,
+            ) as response:
+                _LOGGER.debug("Login response status: %s", response.status)
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, TimeoutError) as e:
+            self.stats.record(
+                LOGIN_PATH,
+                started,
+                "timeout" if isinstance(e, TimeoutError) else "error",
+            )
+            _LOGGER.error("Login request failed: %s", e)
+            raise JackeryAuthenticationError(f"Request failed: {e}") from e
+
+        self.stats.record(
+            LOGIN_PATH, started, "success" if data.get("code") == 0 else "error"
+        )
+        if self.phase_listener is not None:
+            self.phase_listener("login", time.monotonic() - started)
+        return self._handle_login_response(data)
+
+    async def _get_json(
+        self,
+        url_path: str,
+        full_url: str,
+        params: Optional[dict],
+        deadline: Optional[float] = None,
+    ) -> dict:
+        """Perform one authenticated GET and decode the JSON body."""
+        timeout = self._timeout_until(deadline)
+        started = time.monotonic()
+        try:
+            async with self._session.get(
+                full_url,
+                headers=self._request_headers(),
+                params=params,
+                timeout=timeout,
+            ) as response:
+                received = time.monotonic()
+                _LOGGER.debug("API response status: %s", response.status)
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        except TimeoutError:
+            self.stats.record(url_path, started, "timeout")
+            raise
+        except aiohttp.ClientError:
+            self.stats.record(url_path, started, "error")
+            raise
+
+        if self.phase_listener is not None:
+            # Round trip until the headers, then reading and parsing the body
+            self.phase_listener("http", received - started)
+            self.phase_listener("json", time.monotonic() - received)
+
+        # An expired token is counted separately, not as an error
+        code = data.get("code")
+        self.stats.record(
+            url_path,
+            started,
+            "success" if code in (0, TOKEN_EXPIRED_CODE) else "error",
+        )
+        return data
+
+    def hedge_delay(self, url_path: str) -> Optional[float]:
+        """Return how long to wait before hedging a request, in seconds.
+
+        This is the endpoint's p95 latency, or None while there are too few
+        samples to estimate it.
+        """
+        stats = self.stats.endpoint(url_path)
+        if stats.count < HEDGE_MIN_SAMPLES:
+            return None
+        return stats.percentile(95) / 1000
+
+    async def _request_allowed(self, deadline: Optional[float]) -> bool:
+        """Return True once an extra request may be sent before the deadline."""
+        if self.request_gate is None:
+            return True
+        return await self.request_gate(deadline)
+
+    async def _get_json_hedge(
+        self,
+        url_path: str,
+        full_url: str,
+        params: Optional[dict],
+        deadline: Optional[float],
+    ) -> dict:
+        """Send the duplicate of a slow request once the gate allows it."""
+        if not await self._request_allowed(deadline):
+            raise TimeoutError("No request slot left for the hedged request")
+        self.stats.hedged += 1
+        return await self._get_json(url_path, full_url, params, deadline)
+
+    async def _get_json_hedged(
+        self,
+        url_path: str,
+        full_url: str,
+        params: Optional[dict],
+        deadline: Optional[float],
+        delay: float,
+    ) -> dict:
+        """Send a duplicate request if the first is slower than delay.
+
+        The first answer wins and the other request is cancelled. If one of
+        them fails the other is still awaited. The duplicate is only sent if
+        the request gate allows it before the deadline.
+        """
+        first = asyncio.ensure_future(
+            self._get_json(url_path, full_url, params, deadline)
+        )
+        done: set[asyncio.Future] = set()
+        pending: set[asyncio.Future] = {first}
+        try:
+            # Inside the try so a cancelled caller also cancels the request
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                pending.add(
+                    asyncio.ensure_future(
+                        self._get_json_hedge(url_path, full_url, params, deadline)
+                    )
+                )
+            while True:
+                if not done:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                task = done.pop()
+                if task.exception() is None or not (done or pending):
+                    break
+        finally:
+            for other in pending:
+                other.cancel()
+            for other in done:
+                # Both finished at once; mark the loser's outcome as retrieved
+                other.exception()
+        if task is not first and task.exception() is None:
+            self.stats.hedge_wins += 1
+        return task.result()
+
+    async def _get_request(
+        self,
+        url_path: str,
+        params: Optional[dict] = None,
+        deadline: Optional[float] = None,
+        hedge: bool = False,
+    ) -> dict:
+        """Make a GET request to the API, handling token expiry.
+
+        With a monotonic deadline, the request, any re-login and the retry
+        all have to fit in the remaining budget. With hedge set, a duplicate
+        request is sent when the first one is slower than the endpoint's p95.
+        """
+        if not self._token:
+            _LOGGER.info("No token found, logging in.")
+            await self._async_relogin(None, deadline)
+
+        full_url = f"{self.base_url}{url_path}"
+        _LOGGER.debug("Making API request to: %s", full_url)
+
+        try:
+            # The headers are built from this token before the first await
+            token = self._token
+            delay = self.hedge_delay(url_path) if hedge else None
+            if delay is not None:
+                data = await self._get_json_hedged(
+                    url_path, full_url, params, deadline, delay
+                )
+            else:
+                data = await self._get_json(url_path, full_url, params, deadline)
+            _LOGGER.debug("API response data: %s", data)
+
+            # Check for expired token (code=10402)
+            if data.get("code") == TOKEN_EXPIRED_CODE:
+                _LOGGER.info("Token expired. Re-logging in...")
+                self.stats.token_expired += 1
+                await self._async_relogin(token, deadline)
+                # Retry the request with the new token
+                if not await self._request_allowed(deadline):
+                    raise TimeoutError("No request slot left for the retry")
+                data = await self._get_json(url_path, full_url, params, deadline)
+
+            return self._check_response(data)
+
+        except (aiohttp.ClientError, TimeoutError) as e:
+            _LOGGER.error("API request failed: %s", e)
+            raise
+
+    async def get_device_list(self) -> dict:
+        """Get the list of devices."""
+        _LOGGER.info("Attempting to fetch device list from Jackery API")
+        try:
+            result = await self._get_request(DEVICE_LIST_PATH)
+            _LOGGER.info("Successfully retrieved device list")
+            return result
+        except Exception as e:
+            _LOGGER.error("Failed to get device list: %s", str(e))
+            raise
+
+    async def get_device_detail(
+        self, device_id: str, deadline: Optional[float] = None, hedge: bool = False
+    ) -> dict:
+        """Get detailed information for a specified device.
+
+        See _get_request for the deadline and hedge arguments.
+        """
+        return await self._get_request(
+            DEVICE_PROPERTY_PATH,
+            params={"deviceId": device_id},
+            deadline=deadline,
+            hedge=hedge,
+        )
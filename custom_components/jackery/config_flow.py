@@ -1,14 +1,48 @@
 """Config flow for Jackery integration."""
 
+from __future__ import annotations
+
 import logging
+from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
-from .api import JackeryAPI, JackeryAuthenticationError
-from .const import DOMAIN
+from .api import JackeryAuthenticationError
+from .const import (
+    CONF_BACKOFF_MAX,
+    CONF_BREAKER_FAILURE_THRESHOLD,
+    CONF_DEVICE_POLL_INTERVALS,
+    CONF_ENDPOINTS,
+    CONF_HEDGE_REQUESTS,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MAX_REQUESTS_PER_SEC,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_REFRESH_MIN_INTERVAL,
+    CONF_REQUEST_TIMEOUT,
+    DEFAULT_BACKOFF_MAX_SEC,
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_HEDGE_REQUESTS,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_POLL_INTERVAL_SEC,
+    DEFAULT_MAX_REQUESTS_PER_SEC,
+    DEFAULT_MIN_POLL_INTERVAL_SEC,
+    DEFAULT_POWER_DEADBAND_W,
+    DEFAULT_REFRESH_MIN_INTERVAL_SEC,
+    DEFAULT_REQUEST_TIMEOUT_SEC,
+    DOMAIN,
+)
+from .registry import async_get_registry
+from .store import async_get_token_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,20 +50,109 @@ DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_USERNAME): str,
         vol.Required(CONF_PASSWORD): str,
+        vol.Optional(CONF_ENDPOINTS, default=""): TextSelector(
+            TextSelectorConfig(multiline=True)
+        ),
     }
 )
 
+CONF_DEVICE = "device"
+CONF_POLL_INTERVAL = "poll_interval"
+
+# Option key, default and validator of every polling tunable
+POLLING_OPTIONS: tuple[tuple[str, Any, Any], ...] = (
+    (
+        CONF_MIN_POLL_INTERVAL,
+        DEFAULT_MIN_POLL_INTERVAL_SEC,
+        vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+    ),
+    (
+        CONF_MAX_POLL_INTERVAL,
+        DEFAULT_MAX_POLL_INTERVAL_SEC,
+        vol.All(vol.Coerce(int), vol.Range(min=5, max=86400)),
+    ),
+    (
+        CONF_REQUEST_TIMEOUT,
+        DEFAULT_REQUEST_TIMEOUT_SEC,
+        vol.All(vol.Coerce(float), vol.Range(min=1, max=60)),
+    ),
+    (
+        CONF_MAX_CONCURRENT_REQUESTS,
+        DEFAULT_MAX_CONCURRENT_REQUESTS,
+        vol.All(vol.Coerce(int), vol.Range(min=1, max=64)),
+    ),
+    (
+        CONF_MAX_REQUESTS_PER_SEC,
+        DEFAULT_MAX_REQUESTS_PER_SEC,
+        vol.All(vol.Coerce(float), vol.Range(min=0.1, max=100)),
+    ),
+    (
+        CONF_BACKOFF_MAX,
+        DEFAULT_BACKOFF_MAX_SEC,
+        vol.All(vol.Coerce(int), vol.Range(min=5, max=86400)),
+    ),
+    (
+        CONF_BREAKER_FAILURE_THRESHOLD,
+        DEFAULT_BREAKER_FAILURE_THRESHOLD,
+        vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+    ),
+    (
+        CONF_POWER_DEADBAND,
+        DEFAULT_POWER_DEADBAND_W,
+        vol.All(vol.Coerce(float), vol.Range(min=0, max=1000)),
+    ),
+    (
+        CONF_REFRESH_MIN_INTERVAL,
+        DEFAULT_REFRESH_MIN_INTERVAL_SEC,
+        vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+    ),
+    (CONF_HEDGE_REQUESTS, DEFAULT_HEDGE_REQUESTS, bool),
+    (CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS, bool),
+)
+
+
+def parse_endpoints(text: str) -> list[str]:
+    """Return the endpoint base URLs entered one per line.
+
+    Raises vol.Invalid if one of them is not an http or https URL.
+    """
+    endpoints = [
+        line.strip().rstrip("/") for line in text.splitlines() if line.strip()
+    ]
+    for endpoint in endpoints:
+        cv.url(endpoint)
+    return endpoints
+
+
+async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, Any]:
+    """Validate the user input allows us to connect.
+
+    The regional endpoints entered, or else the default endpoint, are tried
+    in order until one accepts the account.
+    """
+    api = async_get_registry(hass).async_create_client(
+        data[CONF_USERNAME], data[CONF_PASSWORD]
+    )
+    endpoints = parse_endpoints(data.get(CONF_ENDPOINTS, ""))
 
-async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, str]:
-    """Validate the user input allows us to connect."""
-    api = JackeryAPI(account=data[CONF_USERNAME], password=data[CONF_PASSWORD])
+    for endpoint in endpoints or [api.default_base_url]:
+        api.set_base_url(endpoint)
+        try:
+            if await api.login():
+                break
+        except JackeryAuthenticationError as err:
+            _LOGGER.debug("Login at %s failed: %s", endpoint, err)
+    else:
+        raise JackeryAuthenticationError("No endpoint accepted the account")
 
-    # The login method is synchronous, so we run it in an executor
-    if not await hass.async_add_executor_job(api.login):
-        raise JackeryAuthenticationError("Login returned false")
+    # Hand the token over to setup so it does not have to log in again
+    token_store = await async_get_token_store(hass)
+    token_store.async_set_token(
+        api.account, api.token, api.token_issued_at, api.base_url
+    )
 
     # Return info we want to store in the config entry.
-    return {"title": data[CONF_USERNAME]}
+    return {"title": data[CONF_USERNAME], CONF_ENDPOINTS: endpoints}
 
 
 class JackeryConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -37,6 +160,14 @@ class JackeryConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> JackeryOptionsFlow:
+        """Return the options flow."""
+        return JackeryOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
         errors: dict[str, str] = {}
@@ -47,7 +178,20 @@ class JackeryConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(user_input[CONF_USERNAME])
                 self._abort_if_unique_id_configured()
 
-                return self.async_create_entry(title=info["title"], data=user_input)
+                return self.async_create_entry(
+                    title=info["title"],
+                    data={
+                        CONF_USERNAME: user_input[CONF_USERNAME],
+                        CONF_PASSWORD: user_input[CONF_PASSWORD],
+                    },
+                    options=(
+                        {CONF_ENDPOINTS: info[CONF_ENDPOINTS]}
+                        if info[CONF_ENDPOINTS]
+                        else {}
+                    ),
+                )
+            except vol.Invalid:
+                errors[CONF_ENDPOINTS] = "invalid_endpoint"
             except JackeryAuthenticationError:
                 errors["base"] = "invalid_auth"
             except Exception:  # pylint: disable=broad-except
@@ -57,3 +201,116 @@ class JackeryConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(
             step_id="user", data_schema=DATA_SCHEMA, errors=errors
         )
+
+
+class JackeryOptionsFlow(config_entries.OptionsFlow):
+    """Handle the polling and request options of a Jackery account.
+
+    Saved options are applied to the running coordinator without reloading
+    the entry, except for the statistics import, which changes the entities.
+    """
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose between the account-wide and per-device options."""
+        return self.async_show_menu(
+            step_id="init", menu_options=["polling", "device", "endpoints"]
+        )
+
+    async def async_step_polling(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the polling and request tunables of the account."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_MAX_POLL_INTERVAL] < user_input[CONF_MIN_POLL_INTERVAL]:
+                errors[CONF_MAX_POLL_INTERVAL] = "max_below_min"
+            else:
+                return self.async_create_entry(
+                    title="", data={**self._entry.options, **user_input}
+                )
+
+        options = self._entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(key, default=options.get(key, default)): validator
+                for key, default, validator in POLLING_OPTIONS
+            }
+        )
+        return self.async_show_form(
+            step_id="polling", data_schema=schema, errors=errors
+        )
+
+    async def async_step_device(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Override the poll interval of one device; 0 removes the override."""
+        overrides = dict(self._entry.options.get(CONF_DEVICE_POLL_INTERVALS, {}))
+        if user_input is not None:
+            device_id = user_input[CONF_DEVICE]
+            if interval := user_input[CONF_POLL_INTERVAL]:
+                overrides[device_id] = interval
+            else:
+                overrides.pop(device_id, None)
+            return self.async_create_entry(
+                title="",
+                data={**self._entry.options, CONF_DEVICE_POLL_INTERVALS: overrides},
+            )
+
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if entry_data is None:
+            return self.async_abort(reason="not_loaded")
+        devices = {
+            device_id: device.get("devName", device_id)
+            for device_id, device in entry_data["coordinator"].devices.items()
+        }
+        # Devices that disappeared keep their override until it is removed
+        devices.update(
+            {device_id: device_id for device_id in overrides if device_id not in devices}
+        )
+        if not devices:
+            return self.async_abort(reason="no_devices")
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_DEVICE): vol.In(devices),
+                vol.Required(CONF_POLL_INTERVAL, default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=86400)
+                ),
+            }
+        )
+        return self.async_show_form(step_id="device", data_schema=schema)
+
+    async def async_step_endpoints(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Set the regional endpoints, one base URL per line."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                endpoints = parse_endpoints(user_input.get(CONF_ENDPOINTS, ""))
+            except vol.Invalid:
+                errors[CONF_ENDPOINTS] = "invalid_endpoint"
+            else:
+                options = {**self._entry.options, CONF_ENDPOINTS: endpoints}
+                if not endpoints:
+                    # Back to the default endpoint
+                    del options[CONF_ENDPOINTS]
+                return self.async_create_entry(title="", data=options)
+
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_ENDPOINTS,
+                    default="\n".join(self._entry.options.get(CONF_ENDPOINTS, [])),
+                ): TextSelector(TextSelectorConfig(multiline=True)),
+            }
+        )
+        return self.async_show_form(
+            step_id="endpoints", data_schema=schema, errors=errors
+        )
@@ -15,6 +15,7 @@ from homeassistant.components.sensor import (
 from homeassistant.const import (
     PERCENTAGE,
     UnitOfElectricPotential,
+    UnitOfEnergy,
     UnitOfPower,
     UnitOfTemperature,
     UnitOfTime,
@@ -23,8 +24,116 @@ from homeassistant.const import (
 # The domain of your integration. Should be unique.
 DOMAIN = "jackery"
 
-# Polling interval
-POLLING_INTERVAL_SEC = 60
+# Key of the shared client registry in hass.data[DOMAIN]
+DATA_REGISTRY = "registry"
+
+# Storage for auth tokens, shared by the config flow and setup
+TOKEN_STORAGE_KEY = f"{DOMAIN}.tokens"
+TOKEN_STORAGE_VERSION = 1
+TOKEN_SAVE_DELAY_SEC = 1
+
+# Regional endpoints of the Jackery cloud to choose from, as base URLs; only
+# the default endpoint of the client is used when none are configured.
+# Several endpoints are probed this many times each, then the fastest one
+# that accepts the account is kept until the circuit breaker opens
+CONF_ENDPOINTS = "endpoints"
+ENDPOINT_PROBE_SAMPLES = 3
+
+# Last known devices, capabilities and values of each config entry, so
+# entities have a state as soon as setup returns; the key is suffixed with
+# the entry ID
+SNAPSHOT_STORAGE_KEY = f"{DOMAIN}.snapshot"
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY_SEC = 300
+
+# Polling intervals; active devices use the minimum, idle devices the maximum
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+DEFAULT_MIN_POLL_INTERVAL_SEC = 30
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+DEFAULT_MAX_POLL_INTERVAL_SEC = 300
+
+# Fixed poll intervals of single devices, keyed by device ID; they replace
+# both the minimum and maximum interval for that device
+CONF_DEVICE_POLL_INTERVALS = "device_poll_intervals"
+
+# Every poll interval is randomly stretched or shrunk by up to this fraction
+POLL_JITTER_FRACTION = 0.1
+
+# Requests per second allowed across all accounts; the lowest configured
+# value of any config entry applies
+CONF_MAX_REQUESTS_PER_SEC = "max_requests_per_sec"
+DEFAULT_MAX_REQUESTS_PER_SEC = 5.0
+
+# Failing devices back off exponentially from the minimum interval up to this
+CONF_BACKOFF_MAX = "backoff_max"
+DEFAULT_BACKOFF_MAX_SEC = 900
+
+# Changes of power readings smaller than the deadband are not published
+CONF_POWER_DEADBAND = "power_deadband"
+DEFAULT_POWER_DEADBAND_W = 0
+POWER_DEADBAND_KEYS = ("op", "ip", "acip")
+
+# How often the device list is refreshed to pick up bound or unbound devices
+DEVICE_DISCOVERY_INTERVAL_SEC = 1800
+# While no device is known, a failed device list is retried sooner, backing
+# off exponentially up to the discovery interval
+DEVICE_DISCOVERY_RETRY_SEC = 30
+
+# Rolling power statistics keep up to this many samples from the last hour;
+# energy is not integrated across gaps longer than the longest backoff
+POWER_HISTORY_CAPACITY = 720
+POWER_HISTORY_WINDOW_SEC = 3600
+ENERGY_MAX_GAP_SEC = 900
+
+# The circuit breaker opens after this many consecutive failed or slow
+# requests of one account and probes again after the reset timeout, which
+# doubles after every failed probe
+CONF_BREAKER_FAILURE_THRESHOLD = "breaker_failure_threshold"
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_SLOW_REQUEST_SEC = 5
+BREAKER_RESET_SEC = 60
+BREAKER_MAX_RESET_SEC = 900
+
+# Budget for fetching a single device's properties, including a re-login
+# and the retry that follows it
+CONF_REQUEST_TIMEOUT = "request_timeout"
+DEFAULT_REQUEST_TIMEOUT_SEC = 10
+
+# Device requests that could not start within this many seconds of a tick,
+# for example while waiting for the request limiter, wait for the next tick
+REFRESH_START_WINDOW_SEC = 20
+
+# Send a duplicate property request when the first one is slower than the
+# observed p95 latency and use whichever answers first
+CONF_HEDGE_REQUESTS = "hedge_requests"
+DEFAULT_HEDGE_REQUESTS = False
+
+# Import hourly mean, min and max of the measurement sensors as external
+# long-term statistics in batches, instead of letting the recorder compile
+# them from every state change; high-churn sensors are then only written
+# every THROTTLED_WRITE_INTERVAL_SEC
+CONF_IMPORT_STATISTICS = "import_statistics"
+DEFAULT_IMPORT_STATISTICS = False
+THROTTLED_SENSOR_KEYS = ("last_updated",)
+THROTTLED_WRITE_INTERVAL_SEC = 900
+
+# Maximum number of device requests in flight at once for one account
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+
+# The refresh service skips devices polled less than this many seconds ago
+CONF_REFRESH_MIN_INTERVAL = "refresh_min_interval"
+DEFAULT_REFRESH_MIN_INTERVAL_SEC = 5
+SERVICE_REFRESH = "refresh"
+
+# The profile service instruments this many poll cycles unless told
+# otherwise and writes its reports to PROFILE_DIRECTORY in the config folder
+SERVICE_PROFILE = "profile"
+ATTR_POLLS = "polls"
+DEFAULT_PROFILE_POLLS = 3
+MAX_PROFILE_POLLS = 50
+PROFILE_DIRECTORY = "jackery_profiles"
+PROFILE_TOP_FUNCTIONS = 30
 
 
 @dataclass
@@ -34,6 +143,15 @@ class JackerySensorEntityDescription(SensorEntityDescription):
     value: Callable[[any], any] | None = None
 
 
+@dataclass
+class JackeryStatisticSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor computed from a device's power history."""
+
+    # The power key the statistic is computed from
+    source_key: str = ""
+    value: Callable[[any], any] | None = None
+
+
 # Sensor descriptions
 # This defines all the sensors we'll create for each device.
 SENSOR_DESCRIPTIONS: tuple[JackerySensorEntityDescription, ...] = (
@@ -137,3 +255,84 @@ BINARY_SENSOR_DESCRIPTIONS: tuple[BinarySensorEntityDescription, ...] = (
         icon="mdi:usb-port",
     ),
 )
+
+# Statistic sensor descriptions
+# These are computed from the in-memory history of the last hour of polls.
+STATISTIC_SENSOR_DESCRIPTIONS: tuple[JackeryStatisticSensorEntityDescription, ...] = (
+    JackeryStatisticSensorEntityDescription(
+        key="op_mean",
+        source_key="op",
+        name="Output Power (1h Mean)",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value=lambda history: history.output.mean,
+    ),
+    JackeryStatisticSensorEntityDescription(
+        key="op_min",
+        source_key="op",
+        name="Output Power (1h Min)",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        value=lambda history: history.output.minimum,
+    ),
+    JackeryStatisticSensorEntityDescription(
+        key="op_max",
+        source_key="op",
+        name="Output Power (1h Max)",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        value=lambda history: history.output.maximum,
+    ),
+    JackeryStatisticSensorEntityDescription(
+        key="ip_mean",
+        source_key="ip",
+        name="Input Power (1h Mean)",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value=lambda history: history.input.mean,
+    ),
+    JackeryStatisticSensorEntityDescription(
+        key="ip_min",
+        source_key="ip",
+        name="Input Power (1h Min)",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        value=lambda history: history.input.minimum,
+    ),
+    JackeryStatisticSensorEntityDescription(
+        key="ip_max",
+        source_key="ip",
+        name="Input Power (1h Max)",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        value=lambda history: history.input.maximum,
+    ),
+    JackeryStatisticSensorEntityDescription(
+        key="output_energy",
+        source_key="op",
+        name="Output Energy",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=3,
+        value=lambda history: history.output.energy_kwh,
+    ),
+    JackeryStatisticSensorEntityDescription(
+        key="input_energy",
+        source_key="ip",
+        name="Input Energy",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=3,
+        value=lambda history: history.input.energy_kwh,
+    ),
+)
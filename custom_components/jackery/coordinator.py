@@ -0,0 +1,776 @@
+"""Data update coordinator for Jackery."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
+
+from .api import AsyncJackeryAPI, JackeryAuthenticationError
+from .const import (
+    BREAKER_MAX_RESET_SEC,
+    BREAKER_RESET_SEC,
+    BREAKER_SLOW_REQUEST_SEC,
+    CONF_BACKOFF_MAX,
+    CONF_BREAKER_FAILURE_THRESHOLD,
+    CONF_DEVICE_POLL_INTERVALS,
+    CONF_ENDPOINTS,
+    CONF_HEDGE_REQUESTS,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_MAX_REQUESTS_PER_SEC,
+    CONF_POWER_DEADBAND,
+    CONF_REFRESH_MIN_INTERVAL,
+    CONF_REQUEST_TIMEOUT,
+    DEFAULT_BACKOFF_MAX_SEC,
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_HEDGE_REQUESTS,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_POLL_INTERVAL_SEC,
+    DEFAULT_MAX_REQUESTS_PER_SEC,
+    DEFAULT_MIN_POLL_INTERVAL_SEC,
+    DEFAULT_POWER_DEADBAND_W,
+    DEFAULT_REFRESH_MIN_INTERVAL_SEC,
+    DEFAULT_REQUEST_TIMEOUT_SEC,
+    DEVICE_DISCOVERY_INTERVAL_SEC,
+    DEVICE_DISCOVERY_RETRY_SEC,
+    DOMAIN,
+    ENDPOINT_PROBE_SAMPLES,
+    ENERGY_MAX_GAP_SEC,
+    POLL_JITTER_FRACTION,
+    POWER_DEADBAND_KEYS,
+    POWER_HISTORY_CAPACITY,
+    POWER_HISTORY_WINDOW_SEC,
+    PROFILE_DIRECTORY,
+    PROFILE_TOP_FUNCTIONS,
+    REFRESH_START_WINDOW_SEC,
+)
+from .decode import KEY_INDEX, DeviceSnapshot, decode
+from .external_statistics import HourlyStatisticsBuffer
+from .history import DevicePowerHistory
+from .scheduler import CircuitBreaker, DevicePollScheduler, RequestLimiter
+
+if TYPE_CHECKING:
+    from .profiler import PollProfiler
+
+_LOGGER = logging.getLogger(__name__)
+
+ALL_INDEXES = frozenset(KEY_INDEX.values())
+INPUT_POWER_INDEX = KEY_INDEX["ip"]
+LAST_UPDATED_INDEX = KEY_INDEX["last_updated"]
+OUTPUT_POWER_INDEX = KEY_INDEX["op"]
+DEADBAND_INDEXES = frozenset(
+    KEY_INDEX[key] for key in POWER_DEADBAND_KEYS if key in KEY_INDEX
+)
+
+
+class JackeryCoordinator(DataUpdateCoordinator[dict[str, DeviceSnapshot]]):
+    """Poll the devices of a Jackery account from a single timer.
+
+    Each tick fetches the devices the scheduler reports as due, concurrently
+    and bounded by a semaphore, then sleeps until the next device is due.
+    Every request also waits for the request limiter shared by all accounts.
+    Devices whose request could not start within REFRESH_START_WINDOW_SEC
+    of the tick stay due for the next one, which bounds a tick to that
+    window plus the request timeout.
+    The data is a mapping of device ID to the decoded snapshot of its latest
+    properties; a device whose request failed is left out so only its own
+    entities become unavailable.
+
+    After every tick changed_indexes holds, per device, the snapshot indexes
+    whose published value changed, so entities can skip identical state
+    writes. Power readings that moved less than the configured deadband keep
+    their previously published value.
+
+    async_refresh_devices fetches devices on demand between ticks. A device
+    has at most one request in flight: callers asking for a device that is
+    being fetched wait for that request, and devices polled less than the
+    refresh minimum interval ago are not fetched again.
+
+    With several regional endpoints configured, the client uses the fastest
+    reachable one that accepts the account. It is chosen on startup, keeping
+    a restored token if its endpoint is still the fastest, and again
+    whenever the circuit breaker opens or the endpoints change.
+
+    async_start_profile instruments the next poll cycles with cProfile and
+    phase timers and writes a report once they completed.
+
+    The device list is refreshed in the background by async_discover_devices,
+    which adds and removes single devices without touching the others.
+    On startup the state saved by the previous run is restored and
+    async_start fetches the device list and first data in the background.
+    While no device is known and the device list cannot be fetched, updates
+    fail with that error and the list is retried with backoff.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: AsyncJackeryAPI,
+        devices: list[dict],
+        limiter: RequestLimiter | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"Jackery {entry.title}",
+            update_interval=timedelta(seconds=DEFAULT_MIN_POLL_INTERVAL_SEC),
+        )
+        self.api = api
+        self._entry = entry
+        self._limiter = limiter
+        if limiter:
+            # Hedged and retried requests take a limiter token too
+            api.request_gate = self._async_acquire_extra
+        self.devices: dict[str, dict] = {device["devId"]: device for device in devices}
+        # Error of the last device list refresh, None once it succeeded
+        self.discovery_error: Exception | None = None
+        self.scheduler = DevicePollScheduler(
+            min_interval=DEFAULT_MIN_POLL_INTERVAL_SEC,
+            max_interval=DEFAULT_MAX_POLL_INTERVAL_SEC,
+            backoff_max=DEFAULT_BACKOFF_MAX_SEC,
+            jitter=POLL_JITTER_FRACTION,
+        )
+        self.breaker = CircuitBreaker(
+            DEFAULT_BREAKER_FAILURE_THRESHOLD,
+            BREAKER_SLOW_REQUEST_SEC,
+            BREAKER_RESET_SEC,
+            BREAKER_MAX_RESET_SEC,
+        )
+        self._semaphore = asyncio.Semaphore(DEFAULT_MAX_CONCURRENT_REQUESTS)
+        self._max_concurrent = DEFAULT_MAX_CONCURRENT_REQUESTS
+        self._deadband: float = DEFAULT_POWER_DEADBAND_W
+        self._hedge: bool = DEFAULT_HEDGE_REQUESTS
+        self._request_timeout: float = DEFAULT_REQUEST_TIMEOUT_SEC
+        self._refresh_min_interval: float = DEFAULT_REFRESH_MIN_INTERVAL_SEC
+        # Configured endpoints and the round-trip times of the last probe
+        self.endpoints: list[str] = []
+        self.endpoint_latency: dict[str, float | None] = {}
+        self._endpoint_task: asyncio.Task[None] | None = None
+        self._breaker_openings = 0
+        self.async_apply_options(entry.options)
+        # Fetch of each device with a request in flight
+        self._in_flight: dict[str, asyncio.Future[dict[str, Any] | None]] = {}
+        # Profiler of the upcoming poll cycles and the report of the last run
+        self.profiler: PollProfiler | None = None
+        self.last_profile: dict[str, Any] | None = None
+        # Hourly long-term statistics imported in batches, if enabled
+        self.statistics: HourlyStatisticsBuffer | None = (
+            HourlyStatisticsBuffer(ENERGY_MAX_GAP_SEC)
+            if entry.options.get(CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS)
+            else None
+        )
+        self.changed_indexes: dict[str, frozenset[int]] = {}
+        # Keys each product type has reported, so entities are only created
+        # for what a model actually emits; the generation is bumped whenever
+        # a key is first seen or the device list changes
+        self.capabilities: dict[str | None, set[str]] = {}
+        self.capabilities_generation = 0
+        self.power_history: dict[str, DevicePowerHistory] = {}
+        # Set while the data is not live: restored from the previous run, or
+        # kept while the breaker is open
+        self.stale_since: datetime | None = None
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply the tunables of the options flow to the running coordinator."""
+        self.scheduler.configure(
+            min_interval=options.get(
+                CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL_SEC
+            ),
+            max_interval=options.get(
+                CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL_SEC
+            ),
+            backoff_max=options.get(CONF_BACKOFF_MAX, DEFAULT_BACKOFF_MAX_SEC),
+            overrides=dict(options.get(CONF_DEVICE_POLL_INTERVALS, {})),
+            now=time.monotonic(),
+        )
+        self.breaker.failure_threshold = options.get(
+            CONF_BREAKER_FAILURE_THRESHOLD, DEFAULT_BREAKER_FAILURE_THRESHOLD
+        )
+        max_concurrent = options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        if max_concurrent != self._max_concurrent:
+            # Requests in flight finish on the previous semaphore
+            self._semaphore = asyncio.Semaphore(max_concurrent)
+            self._max_concurrent = max_concurrent
+        self._deadband = options.get(CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND_W)
+        self._hedge = options.get(CONF_HEDGE_REQUESTS, DEFAULT_HEDGE_REQUESTS)
+        self._request_timeout = options.get(
+            CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT_SEC
+        )
+        self._refresh_min_interval = options.get(
+            CONF_REFRESH_MIN_INTERVAL, DEFAULT_REFRESH_MIN_INTERVAL_SEC
+        )
+        self.api.set_request_timeout(self._request_timeout)
+        endpoints = list(
+            options.get(CONF_ENDPOINTS) or [self.api.default_base_url]
+        )
+        if endpoints != self.endpoints:
+            # The endpoint is chosen by async_start the first time
+            initial = not self.endpoints
+            self.endpoints = endpoints
+            if not initial:
+                self._async_schedule_endpoint_selection()
+        if self._limiter:
+            self._limiter.set_limit(
+                self._entry.entry_id,
+                options.get(CONF_MAX_REQUESTS_PER_SEC, DEFAULT_MAX_REQUESTS_PER_SEC),
+            )
+
+    @callback
+    def async_restore(self, cache: dict[str, Any]) -> None:
+        """Serve the state saved by the previous run until the first poll.
+
+        The restored values are marked stale since they were saved.
+        """
+        self.devices = {device["devId"]: device for device in cache["devices"]}
+        for product_type, keys in cache["capabilities"]:
+            self.capabilities[product_type] = set(keys) & KEY_INDEX.keys()
+        self.capabilities_generation += 1
+
+        data: dict[str, DeviceSnapshot] = {}
+        for device_id, values in cache["snapshots"].items():
+            if device_id not in self.devices:
+                continue
+            snapshot = data[device_id] = DeviceSnapshot.from_dict(values)
+            if isinstance(last_updated := snapshot.values[LAST_UPDATED_INDEX], str):
+                snapshot.values[LAST_UPDATED_INDEX] = dt_util.parse_datetime(
+                    last_updated
+                )
+        self.data = data
+        self.stale_since = dt_util.parse_datetime(cache["saved_at"])
+
+    @callback
+    def async_cache_data(self) -> dict[str, Any]:
+        """Return the state to restore on the next start."""
+        return {
+            "saved_at": dt_util.utcnow().isoformat(),
+            "devices": list(self.devices.values()),
+            "capabilities": [
+                [product_type, sorted(keys)]
+                for product_type, keys in self.capabilities.items()
+            ],
+            "snapshots": {
+                device_id: snapshot.as_dict()
+                for device_id, snapshot in (self.data or {}).items()
+            },
+        }
+
+    async def async_start(self) -> None:
+        """Fetch the device list and the first live data after setup."""
+        # A restored token carries the endpoint chosen earlier, but with
+        # several endpoints their latency has not been measured yet
+        if (
+            self.api.token is None
+            or self.api.base_url not in self.endpoints
+            or (len(self.endpoints) > 1 and not self.endpoint_latency)
+        ):
+            await self._async_select_endpoint()
+        retry = DEVICE_DISCOVERY_RETRY_SEC
+        while not await self.async_discover_devices() and not self.devices:
+            # Nothing to poll; the refresh records the failure
+            await self.async_refresh()
+            await asyncio.sleep(retry)
+            retry = min(retry * 2, DEVICE_DISCOVERY_INTERVAL_SEC)
+        if not self.devices:
+            # Devices bound later are picked up by the periodic discovery
+            _LOGGER.warning("No Jackery devices found for this account.")
+        await self.async_refresh()
+
+    async def _async_select_endpoint(self) -> None:
+        """Switch to the fastest endpoint that accepts the account."""
+        previous = self.api.base_url
+        if len(self.endpoints) == 1:
+            self.api.set_base_url(self.endpoints[0])
+            return
+
+        latencies = await asyncio.gather(
+            *(
+                self.api.probe(endpoint, ENDPOINT_PROBE_SAMPLES)
+                for endpoint in self.endpoints
+            )
+        )
+        self.endpoint_latency = dict(zip(self.endpoints, latencies))
+        reachable = sorted(
+            (latency, endpoint)
+            for endpoint, latency in self.endpoint_latency.items()
+            if latency is not None
+        )
+        for latency, endpoint in reachable:
+            self.api.set_base_url(endpoint)
+            if endpoint == previous and self.api.token is not None:
+                # The current token was issued by this endpoint
+                _LOGGER.info(
+                    "Using Jackery endpoint %s (%.0f ms round trip)", endpoint, latency
+                )
+                return
+            try:
+                accepted = await self.api.login()
+            except JackeryAuthenticationError as err:
+                _LOGGER.debug("Login at %s failed: %s", endpoint, err)
+                continue
+            if not accepted:
+                _LOGGER.debug("Endpoint %s rejected the account", endpoint)
+                continue
+            _LOGGER.info(
+                "Using Jackery endpoint %s (%.0f ms round trip)", endpoint, latency
+            )
+            if endpoint != previous:
+                # A new cloud gets a fresh breaker
+                self.breaker.reset()
+            return
+
+        _LOGGER.warning(
+            "No Jackery endpoint accepted the account, staying on %s", previous
+        )
+        self.api.set_base_url(previous)
+
+    @callback
+    def _async_schedule_endpoint_selection(self) -> None:
+        """Choose the endpoint again in the background, unless already doing so."""
+        if self._endpoint_task is not None:
+            return
+
+        async def _async_select_and_refresh() -> None:
+            try:
+                await self._async_select_endpoint()
+            finally:
+                self._endpoint_task = None
+            await self.async_request_refresh()
+
+        self._endpoint_task = self._entry.async_create_background_task(
+            self.hass,
+            _async_select_and_refresh(),
+            f"{DOMAIN} endpoint selection {self._entry.title}",
+        )
+
+    @callback
+    def _async_serve_stale(
+        self,
+        retry_at: float | None,
+        data: dict[str, DeviceSnapshot] | None = None,
+    ) -> dict[str, DeviceSnapshot]:
+        """Keep the last good data while the circuit breaker is open."""
+        if self.stale_since is None:
+            self.stale_since = dt_util.utcnow()
+        self.changed_indexes = {}
+        if retry_at is not None:
+            self.update_interval = timedelta(
+                seconds=max(retry_at - time.monotonic(), 1)
+            )
+        return data if data is not None else dict(self.data or {})
+
+    def _power_history(self, device_id: str) -> DevicePowerHistory:
+        """Return the power history of a device, creating it if needed."""
+        if (history := self.power_history.get(device_id)) is None:
+            history = self.power_history[device_id] = DevicePowerHistory(
+                POWER_HISTORY_CAPACITY, POWER_HISTORY_WINDOW_SEC, ENERGY_MAX_GAP_SEC
+            )
+        return history
+
+    async def async_discover_devices(self, *_: Any) -> bool:
+        """Refresh the device list and add or remove only changed devices.
+
+        Returns False if the device list could not be fetched.
+        """
+        try:
+            if self._limiter:
+                await self._limiter.acquire(time.monotonic())
+            response = await self.api.get_device_list()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Failed to refresh the device list: %s", err)
+            self.discovery_error = err
+            return False
+        self.discovery_error = None
+
+        devices = {device["devId"]: device for device in response.get("data", [])}
+        added = devices.keys() - self.devices.keys()
+        removed = self.devices.keys() - devices.keys()
+        if not added and not removed:
+            return True
+
+        device_registry = dr.async_get(self.hass)
+        for device_id in removed:
+            _LOGGER.info("Jackery device %s was unbound, removing it", device_id)
+            del self.devices[device_id]
+            self.scheduler.remove(device_id)
+            self.power_history.pop(device_id, None)
+            if self.statistics is not None:
+                self.statistics.remove(device_id)
+            if self.data:
+                self.data.pop(device_id, None)
+            if device := device_registry.async_get_device(
+                identifiers={(DOMAIN, device_id)}
+            ):
+                device_registry.async_update_device(
+                    device.id, remove_config_entry_id=self._entry.entry_id
+                )
+
+        for device_id in added:
+            _LOGGER.info("Found new Jackery device %s", device_id)
+            self.devices[device_id] = devices[device_id]
+
+        self.capabilities_generation += 1
+        if added:
+            # New devices are due immediately; their entities are created
+            # once the first poll reports their capabilities
+            await self.async_request_refresh()
+        else:
+            self.async_update_listeners()
+        return True
+
+    def supported_keys(self, device_id: str) -> set[str]:
+        """Return the keys reported by the model of a device."""
+        return self.capabilities.get(
+            self.devices[device_id].get("productType"), set()
+        )
+
+    def _record_capabilities(self, device_id: str, snapshot: DeviceSnapshot) -> None:
+        """Remember which keys the model of a device emits."""
+        product_type = self.devices[device_id].get("productType")
+        supported = self.capabilities.setdefault(product_type, set())
+        values = snapshot.values
+        new_keys = {
+            key
+            for key, index in KEY_INDEX.items()
+            if values[index] is not None and key not in supported
+        }
+        if new_keys:
+            _LOGGER.debug("Model %s reports new keys %s", product_type, new_keys)
+            supported.update(new_keys)
+            self.capabilities_generation += 1
+
+    def _publish(
+        self, previous: DeviceSnapshot | None, snapshot: DeviceSnapshot
+    ) -> tuple[DeviceSnapshot, frozenset[int]]:
+        """Diff a fresh snapshot against the published one.
+
+        Returns the snapshot to publish and the indexes of the values that
+        changed.
+        """
+        if previous is None:
+            return snapshot, ALL_INDEXES
+
+        values = snapshot.values
+        old_values = previous.values
+        changed = []
+        for index, value in enumerate(values):
+            old = old_values[index]
+            if value == old:
+                continue
+            if (
+                self._deadband
+                and index in DEADBAND_INDEXES
+                and value is not None
+                and old is not None
+                and abs(value - old) < self._deadband
+            ):
+                values[index] = old
+                continue
+            changed.append(index)
+        return snapshot, frozenset(changed)
+
+    async def _async_acquire_extra(self, deadline: float | None) -> bool:
+        """Take a limiter token for an extra request of a device fetch.
+
+        Extra requests queue behind the devices that are due. Returns False
+        if no token was available before the deadline.
+        """
+        if self._limiter is None:
+            return True
+        now = time.monotonic()
+        try:
+            async with asyncio.timeout(None if deadline is None else deadline - now):
+                await self._limiter.acquire(now if deadline is None else deadline)
+        except TimeoutError:
+            return False
+        return True
+
+    async def _async_fetch_device(
+        self, device_id: str, start_by: float
+    ) -> dict[str, Any] | None:
+        """Fetch the raw properties of a single device.
+
+        The request has to start by the monotonic time start_by, otherwise
+        None is returned and the device stays due for the next tick. Once
+        started, the client fits the request, any re-login and the retry
+        into the request timeout.
+        """
+        queued = time.monotonic()
+        async with self._semaphore:
+            if time.monotonic() >= start_by:
+                return None
+            if self._limiter:
+                try:
+                    async with asyncio.timeout(start_by - time.monotonic()):
+                        # The most overdue devices are sent first
+                        await self._limiter.acquire(
+                            self.scheduler.due_at(device_id)
+                        )
+                except TimeoutError:
+                    return None
+            started = time.monotonic()
+            if self.profiler is not None:
+                self.profiler.add_phase("queue_wait", started - queued)
+            deadline = started + self._request_timeout
+            try:
+                async with asyncio.timeout(self._request_timeout):
+                    data = await self.api.get_device_detail(
+                        device_id, deadline=deadline, hedge=self._hedge
+                    )
+            except Exception:
+                self.breaker.record_failure(time.monotonic())
+                raise
+        finished = time.monotonic()
+        self.breaker.record_success(finished - started, finished)
+        properties = data.get("data", {}).get("properties", {})
+        properties["last_updated"] = dt_util.now()
+        return properties
+
+    @callback
+    def async_start_profile(self, polls: int) -> None:
+        """Profile the next poll cycles."""
+        # cProfile and pstats are only loaded once profiling is requested
+        from .profiler import (  # pylint: disable=import-outside-toplevel
+            PollProfiler,
+        )
+
+        self.profiler = PollProfiler(polls)
+        self.api.phase_listener = self.profiler.add_phase
+        _LOGGER.info("Profiling the next %s Jackery poll cycles", polls)
+
+    @callback
+    def _async_end_profile_cycle(self) -> None:
+        """End a profiled cycle once its entities have been dispatched."""
+        if (profiler := self.profiler) is None:
+            return
+        profiler.end_cycle()
+        if not profiler.done:
+            return
+        self.profiler = None
+        self.api.phase_listener = None
+        self._entry.async_create_background_task(
+            self.hass,
+            self._async_write_profile(profiler),
+            f"{DOMAIN} profile report {self._entry.title}",
+        )
+
+    async def _async_write_profile(self, profiler: PollProfiler) -> None:
+        """Write the report of a finished profile."""
+        name = (
+            f"{self._entry.entry_id}_"
+            f"{profiler.started_at.strftime('%Y%m%dT%H%M%SZ')}"
+        )
+        self.last_profile = await self.hass.async_add_executor_job(
+            profiler.write,
+            self.hass.config.path(PROFILE_DIRECTORY),
+            name,
+            PROFILE_TOP_FUNCTIONS,
+        )
+        _LOGGER.info(
+            "Jackery profile of %s poll cycles written to %s",
+            profiler.cycles,
+            self.last_profile["report_path"],
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, timed while profiling."""
+        if (profiler := self.profiler) is None:
+            super().async_update_listeners()
+            return
+        started = time.monotonic()
+        super().async_update_listeners()
+        profiler.add_phase("dispatch", time.monotonic() - started)
+
+    async def _async_update_data(self) -> dict[str, DeviceSnapshot]:
+        """Fetch data for all due devices, profiled if requested."""
+        if self.profiler is None:
+            return await self._async_update_due()
+        try:
+            self.profiler.start_cycle()
+            return await self._async_update_due()
+        finally:
+            # The listeners are updated right after this returns, so the
+            # cycle ends on the next iteration of the event loop
+            self.hass.loop.call_soon(self._async_end_profile_cycle)
+
+    async def _async_update_due(self) -> dict[str, DeviceSnapshot]:
+        """Fetch data for all due devices concurrently."""
+        if not self.devices and (err := self.discovery_error) is not None:
+            if isinstance(err, JackeryAuthenticationError):
+                raise UpdateFailed(f"Authentication error: {err}")
+            raise UpdateFailed(f"Error fetching the device list: {err}")
+        now = time.monotonic()
+        if not self.breaker.allow_request(now):
+            # The cloud is degraded; keep serving the last good data
+            return self._async_serve_stale(self.breaker.retry_at())
+
+        device_ids = self.scheduler.due(list(self.devices), now)
+        if self.breaker.state(now) == CircuitBreaker.HALF_OPEN:
+            # Probe the cloud with a single device before resuming
+            device_ids = device_ids[:1] or list(self.devices)[:1]
+        return await self._async_poll(device_ids, now)
+
+    async def async_refresh_devices(self, device_ids: Iterable[str]) -> None:
+        """Fetch devices now and publish their data.
+
+        Devices with a request in flight are not fetched again; this waits
+        for that request instead. Devices polled less than the refresh
+        minimum interval ago keep their current data.
+        """
+        now = time.monotonic()
+        joined: list[asyncio.Future[dict[str, Any] | None]] = []
+        fetch: list[str] = []
+        for device_id in dict.fromkeys(device_ids):
+            if device_id not in self.devices:
+                continue
+            if (in_flight := self._in_flight.get(device_id)) is not None:
+                joined.append(in_flight)
+            elif not self.scheduler.polled_within(
+                device_id, self._refresh_min_interval, now
+            ):
+                fetch.append(device_id)
+
+        if fetch and self.breaker.allow_request(now):
+            if self.breaker.state(now) == CircuitBreaker.HALF_OPEN:
+                fetch = fetch[:1]
+            try:
+                data = await self._async_poll(fetch, now)
+            except UpdateFailed as err:
+                _LOGGER.warning("On-demand refresh failed: %s", err)
+            else:
+                self.async_set_updated_data(data)
+        elif fetch:
+            _LOGGER.debug("Jackery cloud is failing, not refreshing %s", fetch)
+
+        if joined:
+            await asyncio.wait(joined)
+
+    async def _async_poll(
+        self, device_ids: list[str], now: float
+    ) -> dict[str, DeviceSnapshot]:
+        """Fetch devices concurrently and return the data to publish."""
+        # Devices with a request in flight are published by its caller
+        device_ids = [
+            device_id for device_id in device_ids if device_id not in self._in_flight
+        ]
+        fetches = {
+            device_id: asyncio.ensure_future(
+                self._async_fetch_device(device_id, now + REFRESH_START_WINDOW_SEC)
+            )
+            for device_id in device_ids
+        }
+        self._in_flight.update(fetches)
+        try:
+            results = await asyncio.gather(*fetches.values(), return_exceptions=True)
+        finally:
+            for device_id in fetches:
+                del self._in_flight[device_id]
+
+        # Devices that were not due keep their previous data
+        data: dict[str, DeviceSnapshot] = {
+            device_id: snapshot
+            for device_id, snapshot in (self.data or {}).items()
+            if device_id in self.devices
+        }
+        previous = dict(data)
+        errors: list[Exception] = []
+        failed: list[str] = []
+        changed_indexes: dict[str, frozenset[int]] = {}
+        now = time.monotonic()
+        utc_now = dt_util.utcnow()
+        profiler = self.profiler
+        for device_id, result in zip(device_ids, results):
+            if result is None:
+                # Out of budget for this tick; still due
+                self.breaker.release_probe()
+                continue
+            if isinstance(result, Exception):
+                interval = self.scheduler.record_failure(device_id, now)
+                _LOGGER.warning(
+                    "Error fetching data for device %s, retrying in %ss: %s",
+                    device_id,
+                    interval,
+                    result,
+                )
+                errors.append(result)
+                failed.append(device_id)
+                continue
+            decode_started = time.monotonic()
+            self.scheduler.record_success(device_id, result, now)
+            snapshot = decode(result)
+            self._record_capabilities(device_id, snapshot)
+            # Record the raw readings before the deadband is applied
+            self._power_history(device_id).add(
+                now,
+                snapshot.values[INPUT_POWER_INDEX],
+                snapshot.values[OUTPUT_POWER_INDEX],
+            )
+            if self.statistics is not None:
+                self.statistics.add(device_id, snapshot, utc_now)
+            data[device_id], changed_indexes[device_id] = self._publish(
+                previous.get(device_id), snapshot
+            )
+            if profiler is not None:
+                profiler.add_phase("decode", time.monotonic() - decode_started)
+        self.changed_indexes = changed_indexes
+        if self.breaker.times_opened != self._breaker_openings:
+            # Persistent failures; another endpoint may serve the account
+            self._breaker_openings = self.breaker.times_opened
+            if len(self.endpoints) > 1:
+                self._async_schedule_endpoint_selection()
+        if self.statistics is not None:
+            flush_started = time.monotonic()
+            self.statistics.async_flush(self.hass, self.devices)
+            if profiler is not None:
+                profiler.add_phase("statistics", time.monotonic() - flush_started)
+
+        if data and self.breaker.state(time.monotonic()) != CircuitBreaker.CLOSED:
+            # Failed devices keep their last snapshot while the cloud is out
+            if self.stale_since is None:
+                _LOGGER.warning(
+                    "Jackery cloud is failing, serving the last known data"
+                    " until it recovers"
+                )
+            return self._async_serve_stale(self.breaker.retry_at(), data)
+
+        for device_id in failed:
+            data.pop(device_id, None)
+        if self.stale_since is not None:
+            _LOGGER.info("Jackery data is live again")
+            self.stale_since = None
+
+        # Wake up again when the next device is due
+        next_due = self.scheduler.next_due(list(self.devices))
+        if next_due is not None:
+            self.update_interval = timedelta(
+                seconds=max(next_due - time.monotonic(), 1)
+            )
+
+        if errors and not data:
+            if all(isinstance(err, JackeryAuthenticationError) for err in errors):
+                raise UpdateFailed(f"Authentication error: {errors[0]}")
+            raise UpdateFailed(f"Error communicating with API: {errors[0]}")
+
+        return data
+
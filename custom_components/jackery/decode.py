@@ -0,0 +1,68 @@
+"""Decoding of Jackery property payloads into compact snapshots."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from .const import BINARY_SENSOR_DESCRIPTIONS, SENSOR_DESCRIPTIONS
+
+
+def _is_on(value: Any) -> bool:
+    """Decode an output toggle."""
+    return value == 1
+
+
+def _build_decode_table() -> tuple[tuple[str, Callable[[Any], Any] | None], ...]:
+    """Compile the keys we use and their converters from the descriptions."""
+    table: dict[str, Callable[[Any], Any] | None] = {}
+    for description in SENSOR_DESCRIPTIONS:
+        table.setdefault(description.key, description.value)
+    for description in BINARY_SENSOR_DESCRIPTIONS:
+        table.setdefault(description.key, _is_on)
+    return tuple(table.items())
+
+
+DECODE_TABLE = _build_decode_table()
+
+# Position of every decoded key in DeviceSnapshot.values
+KEY_INDEX: dict[str, int] = {key: index for index, (key, _) in enumerate(DECODE_TABLE)}
+
+
+class DeviceSnapshot:
+    """The decoded values of one poll, indexed like DECODE_TABLE.
+
+    Only the keys used by an entity are kept; a key the device did not
+    report is None.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: list[Any]) -> None:
+        """Initialize the snapshot."""
+        self.values = values
+
+    def get(self, key: str) -> Any:
+        """Return the decoded value of a key."""
+        index = KEY_INDEX.get(key)
+        return None if index is None else self.values[index]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the decoded values keyed by property name."""
+        return {key: self.values[index] for key, index in KEY_INDEX.items()}
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> DeviceSnapshot:
+        """Rebuild a snapshot from the output of as_dict."""
+        return cls([values.get(key) for key in KEY_INDEX])
+
+
+def decode(properties: dict[str, Any]) -> DeviceSnapshot:
+    """Decode a raw property payload once for every entity."""
+    values = []
+    for key, convert in DECODE_TABLE:
+        value = properties.get(key)
+        if value is not None and convert is not None:
+            value = convert(value)
+        values.append(value)
+    return DeviceSnapshot(values)
@@ -0,0 +1,82 @@
+"""Diagnostics support for Jackery."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import JackeryCoordinator
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: JackeryCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    api = coordinator.api
+    now = time.monotonic()
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "client": {
+            "login_count": api.login_count,
+            "logins_avoided": api.logins_avoided,
+            "token_age_sec": (
+                round(time.time() - api.token_issued_at) if api.token else None
+            ),
+            "requests": api.stats.as_dict(),
+            "endpoint": api.base_url,
+            "endpoint_latency_ms": coordinator.endpoint_latency,
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval_sec": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+            "breaker": {
+                "state": coordinator.breaker.state(now),
+                "consecutive_failures": coordinator.breaker.failures,
+                "times_opened": coordinator.breaker.times_opened,
+                "stale_since": (
+                    coordinator.stale_since.isoformat()
+                    if coordinator.stale_since
+                    else None
+                ),
+            },
+            "capabilities": {
+                str(product_type): sorted(keys)
+                for product_type, keys in coordinator.capabilities.items()
+            },
+        },
+        "profile": {
+            "running": (
+                {
+                    "polls": coordinator.profiler.polls,
+                    "cycles": coordinator.profiler.cycles,
+                }
+                if coordinator.profiler
+                else None
+            ),
+            "last_report": coordinator.last_profile,
+        },
+        "devices": {
+            device_id: {
+                "product_type": device.get("productType"),
+                "has_data": device_id in (coordinator.data or {}),
+                "next_poll_in_sec": coordinator.scheduler.seconds_until_due(
+                    device_id, now
+                ),
+            }
+            for device_id, device in coordinator.devices.items()
+        },
+    }
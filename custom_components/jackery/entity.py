@@ -0,0 +1,132 @@
+"""Base entity for Jackery."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import JackeryCoordinator
+from .decode import KEY_INDEX
+
+
+class JackeryEntity(CoordinatorEntity[JackeryCoordinator]):
+    """An entity reading one device's data from the account coordinator."""
+
+    def __init__(
+        self,
+        coordinator: JackeryCoordinator,
+        key: str,
+        device_info: dict,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._device_id = device_info["devId"]
+        self._index = KEY_INDEX.get(key)
+        self._last_available: bool | None = None
+        self._last_stale = False
+
+        # Set a unique ID for this entity
+        self._attr_unique_id = f"{self._device_id}_{key}"
+
+        # Set the device info for this entity
+        # This groups all sensors under a single device in Home Assistant
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, self._device_id)},
+            "name": device_info.get("devName", f"Jackery Device {self._device_id}"),
+            "manufacturer": "Jackery",
+            "model": device_info.get("productType"),
+        }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if this entity's value or availability changed."""
+        available = self.available
+        stale = self.coordinator.stale_since is not None
+        if (
+            available == self._last_available
+            and stale == self._last_stale
+            and not self._value_changed()
+        ):
+            return
+        self._last_available = available
+        self._last_stale = stale
+        self.async_write_ha_state()
+
+    def _value_changed(self) -> bool:
+        """Return True if the last poll changed this entity's value."""
+        return self._index in self.coordinator.changed_indexes.get(
+            self._device_id, ()
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True if the last poll of this device succeeded."""
+        return super().available and self._device_id in self.coordinator.data
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Mark values served from the last good poll while the cloud is out."""
+        if self.coordinator.stale_since is None:
+            return None
+        return {"stale_since": self.coordinator.stale_since.isoformat()}
+
+    @property
+    def decoded_value(self) -> Any:
+        """Return this entity's precomputed value from the snapshot."""
+        snapshot = self.coordinator.data.get(self._device_id)
+        if snapshot is None:
+            return None
+        return snapshot.values[self._index]
+
+
+@callback
+def async_setup_capability_entities(
+    coordinator: JackeryCoordinator,
+    descriptions: Iterable[EntityDescription],
+    entity_factory: Callable[[JackeryCoordinator, Any, dict], JackeryEntity],
+    async_add_entities: AddEntitiesCallback,
+) -> CALLBACK_TYPE:
+    """Add entities for the keys each device's model reports.
+
+    Entities are created now for the known capabilities and later for any
+    key a model reports for the first time. Returns a callback that stops
+    listening for new keys.
+    """
+    added: set[tuple[str, str]] = set()
+    seen_generation = -1
+
+    @callback
+    def _async_add_new_entities() -> None:
+        nonlocal seen_generation
+        if coordinator.capabilities_generation == seen_generation:
+            return
+        seen_generation = coordinator.capabilities_generation
+
+        # Forget removed devices so they get entities again if re-bound
+        added.difference_update(
+            [pair for pair in added if pair[0] not in coordinator.devices]
+        )
+
+        entities = []
+        for device_id, device in coordinator.devices.items():
+            supported = coordinator.supported_keys(device_id)
+            for description in descriptions:
+                # Derived sensors depend on the key they are computed from
+                key = getattr(description, "source_key", None) or description.key
+                if (
+                    key in supported
+                    and (device_id, description.key) not in added
+                ):
+                    added.add((device_id, description.key))
+                    entities.append(entity_factory(coordinator, description, device))
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_new_entities()
+    return coordinator.async_add_listener(_async_add_new_entities)
@@ -0,0 +1,186 @@
+"""Hourly long-term statistics imported from buffered device samples."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import slugify
+
+from .const import DOMAIN, SENSOR_DESCRIPTIONS
+from .decode import KEY_INDEX, DeviceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sensors whose mean, minimum and maximum are imported
+STATISTIC_DESCRIPTIONS = tuple(
+    description
+    for description in SENSOR_DESCRIPTIONS
+    if description.state_class == SensorStateClass.MEASUREMENT
+)
+STATISTIC_INDEXES = tuple(
+    KEY_INDEX[description.key] for description in STATISTIC_DESCRIPTIONS
+)
+
+
+class _HourBucket:
+    """Time-weighted running aggregate of one sensor over one hour.
+
+    As in the recorder's own statistics, each value holds until the next
+    sample, so the mean is not skewed by polling active devices more often.
+    """
+
+    __slots__ = ("area", "span", "minimum", "maximum", "value", "timestamp")
+
+    def __init__(self, value: float, timestamp: float) -> None:
+        """Start the aggregate with its first sample."""
+        self.area = 0.0
+        self.span = 0.0
+        self.minimum = value
+        self.maximum = value
+        self.value = value
+        self.timestamp = timestamp
+
+    def extend(self, timestamp: float) -> None:
+        """Hold the last value until a later time."""
+        elapsed = timestamp - self.timestamp
+        self.area += self.value * elapsed
+        self.span += elapsed
+        self.timestamp = timestamp
+
+    def add(self, value: float, timestamp: float) -> None:
+        """Add a sample."""
+        self.extend(timestamp)
+        self.value = value
+        if value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+
+    @property
+    def mean(self) -> float:
+        """Return the time-weighted mean, the value if only one was seen."""
+        return self.area / self.span if self.span > 0 else self.value
+
+
+class HourlyStatisticsBuffer:
+    """Aggregate polled samples per device into hourly mean, min and max.
+
+    A sample from a later hour closes the device's current hour and queues
+    its aggregates. If it arrived within max_gap seconds of the previous
+    sample, the previous values are held until the end of the hour and
+    carried into the new one. async_flush writes every queued hour of a statistic in
+    one call to the recorder's external statistics API. The hour in
+    progress is never written, as a later import of the same hour would
+    replace it rather than add to it; it is lost on restart.
+
+    The recorder only accepts hourly external statistics, so there are no
+    5-minute aggregates.
+    """
+
+    def __init__(self, max_gap: float) -> None:
+        """Initialize an empty buffer."""
+        self._max_gap = max_gap
+        self._hour: dict[str, datetime] = {}
+        self._buckets: dict[str, list[_HourBucket | None]] = {}
+        # Closed hours per (device ID, description index)
+        self._closed: dict[tuple[str, int], list[dict[str, Any]]] = {}
+
+    def add(self, device_id: str, snapshot: DeviceSnapshot, now: datetime) -> None:
+        """Add the values of one poll taken at a UTC time."""
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        timestamp = now.timestamp()
+        if (current := self._hour.get(device_id)) != hour:
+            carried: list[_HourBucket | None] = [None] * len(STATISTIC_INDEXES)
+            if current is not None:
+                carried = self._close(device_id, current, hour, timestamp)
+            self._hour[device_id] = hour
+            self._buckets[device_id] = carried
+
+        buckets = self._buckets[device_id]
+        values = snapshot.values
+        for position, index in enumerate(STATISTIC_INDEXES):
+            if (value := values[index]) is None:
+                continue
+            if (bucket := buckets[position]) is None:
+                buckets[position] = _HourBucket(value, timestamp)
+            else:
+                bucket.add(value, timestamp)
+
+    def _close(
+        self, device_id: str, hour: datetime, next_hour: datetime, timestamp: float
+    ) -> list[_HourBucket | None]:
+        """Queue the aggregates of a finished hour.
+
+        Returns the buckets of the new hour, starting with the values held
+        across its start.
+        """
+        end = (hour + timedelta(hours=1)).timestamp()
+        start = next_hour.timestamp()
+        carried: list[_HourBucket | None] = []
+        for position, bucket in enumerate(self._buckets[device_id]):
+            if bucket is None:
+                carried.append(None)
+                continue
+            held = timestamp - bucket.timestamp <= self._max_gap
+            if held:
+                bucket.extend(end)
+            self._closed.setdefault((device_id, position), []).append(
+                {
+                    "start": hour,
+                    "mean": bucket.mean,
+                    "min": bucket.minimum,
+                    "max": bucket.maximum,
+                }
+            )
+            carried.append(_HourBucket(bucket.value, start) if held else None)
+        return carried
+
+    def remove(self, device_id: str) -> None:
+        """Forget a device and its queued hours."""
+        self._hour.pop(device_id, None)
+        self._buckets.pop(device_id, None)
+        for key in [key for key in self._closed if key[0] == device_id]:
+            del self._closed[key]
+
+    @staticmethod
+    def statistic_id(device_id: str, key: str) -> str:
+        """Return the external statistic ID of a device's sensor."""
+        return f"{DOMAIN}:{slugify(f'{device_id}_{key}')}"
+
+    @callback
+    def async_flush(self, hass: HomeAssistant, devices: dict[str, dict]) -> int:
+        """Write every closed hour and return the number of rows queued."""
+        if not self._closed:
+            return 0
+        if "recorder" not in hass.config.components:
+            _LOGGER.debug("Recorder is not loaded, keeping hourly statistics")
+            return 0
+
+        # Only imported when the statistics import is enabled
+        from homeassistant.components.recorder.statistics import (  # pylint: disable=import-outside-toplevel
+            async_add_external_statistics,
+        )
+
+        rows = 0
+        for (device_id, position), statistics in self._closed.items():
+            description = STATISTIC_DESCRIPTIONS[position]
+            device = devices.get(device_id, {})
+            async_add_external_statistics(
+                hass,
+                {
+                    "has_mean": True,
+                    "has_sum": False,
+                    "name": f"{device.get('devName', device_id)} {description.name}",
+                    "source": DOMAIN,
+                    "statistic_id": self.statistic_id(device_id, description.key),
+                    "unit_of_measurement": description.native_unit_of_measurement,
+                },
+                statistics,
+            )
+            rows += len(statistics)
+        self._closed.clear()
+        return rows
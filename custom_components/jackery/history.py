@@ -0,0 +1,140 @@
+"""In-memory power history of Jackery devices."""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+
+
+class RollingPowerStats:
+    """A fixed-size ring buffer of power samples with rolling statistics.
+
+    Samples older than window seconds, or beyond capacity, are evicted.
+    Mean, minimum and maximum are kept up to date in amortized O(1) per
+    sample with monotonic queues and a running trapezoidal integral of the
+    window. The mean is weighted by time, as polls are further apart while a
+    device is idle. Energy is integrated over every sample with the same
+    rule. Gaps longer than max_gap seconds are skipped by both.
+    """
+
+    def __init__(self, capacity: int, window: float, max_gap: float) -> None:
+        """Initialize an empty buffer."""
+        self._capacity = capacity
+        self._window = window
+        self._max_gap = max_gap
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        # Area and duration of the segment ending at each sample
+        self._areas = array("d", bytes(8 * capacity))
+        self._spans = array("d", bytes(8 * capacity))
+        # Sequence numbers of the oldest and next sample; slot = seq % capacity
+        self._head = 0
+        self._tail = 0
+        self._area = 0.0
+        self._span = 0.0
+        self._min_queue: deque[int] = deque()
+        self._max_queue: deque[int] = deque()
+        self.energy_kwh = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return self._tail - self._head
+
+    def _evict(self) -> None:
+        """Drop the oldest sample and the segment starting at it."""
+        head = self._head
+        if head + 1 < self._tail:
+            following = (head + 1) % self._capacity
+            self._area -= self._areas[following]
+            self._span -= self._spans[following]
+            self._areas[following] = 0.0
+            self._spans[following] = 0.0
+        if self._min_queue[0] == head:
+            self._min_queue.popleft()
+        if self._max_queue[0] == head:
+            self._max_queue.popleft()
+        self._head += 1
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a sample taken at a monotonic timestamp."""
+        capacity = self._capacity
+        if self._tail > self._head:
+            last = (self._tail - 1) % capacity
+            elapsed = timestamp - self._times[last]
+            if 0 < elapsed <= self._max_gap:
+                self.energy_kwh += (
+                    (self._values[last] + value) / 2 * elapsed / 3_600_000
+                )
+
+        while len(self) and (
+            len(self) >= capacity
+            or self._times[self._head % capacity] < timestamp - self._window
+        ):
+            self._evict()
+
+        tail = self._tail
+        area = span = 0.0
+        if len(self):
+            last = (tail - 1) % capacity
+            elapsed = timestamp - self._times[last]
+            if 0 < elapsed <= self._max_gap:
+                area = (self._values[last] + value) / 2 * elapsed
+                span = elapsed
+        self._times[tail % capacity] = timestamp
+        self._values[tail % capacity] = value
+        self._areas[tail % capacity] = area
+        self._spans[tail % capacity] = span
+        self._area += area
+        self._span += span
+        values = self._values
+        while self._min_queue and values[self._min_queue[-1] % capacity] >= value:
+            self._min_queue.pop()
+        self._min_queue.append(tail)
+        while self._max_queue and values[self._max_queue[-1] % capacity] <= value:
+            self._max_queue.pop()
+        self._max_queue.append(tail)
+        self._tail += 1
+
+    @property
+    def mean(self) -> float | None:
+        """Return the time-weighted mean of the window."""
+        if self._span > 0:
+            return self._area / self._span
+        if len(self):
+            # A single sample, or only samples separated by long gaps
+            return self._values[(self._tail - 1) % self._capacity]
+        return None
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the minimum of the window."""
+        if not self._min_queue:
+            return None
+        return self._values[self._min_queue[0] % self._capacity]
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the maximum of the window."""
+        if not self._max_queue:
+            return None
+        return self._values[self._max_queue[0] % self._capacity]
+
+
+class DevicePowerHistory:
+    """Rolling statistics of a device's input and output power."""
+
+    __slots__ = ("input", "output")
+
+    def __init__(self, capacity: int, window: float, max_gap: float) -> None:
+        """Initialize empty histories."""
+        self.input = RollingPowerStats(capacity, window, max_gap)
+        self.output = RollingPowerStats(capacity, window, max_gap)
+
+    def add(
+        self, timestamp: float, input_power: float | None, output_power: float | None
+    ) -> None:
+        """Record the power readings of one poll."""
+        if input_power is not None:
+            self.input.add(timestamp, input_power)
+        if output_power is not None:
+            self.output.add(timestamp, output_power)
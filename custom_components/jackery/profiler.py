@@ -0,0 +1,169 @@
+"""Profiling of the coordinator's poll cycles."""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+# Packages the own time of the profiled functions is grouped by
+PACKAGE_MARKERS = (
+    ("jackery", os.sep + os.path.join("custom_components", "jackery") + os.sep),
+    ("homeassistant", os.sep + "homeassistant" + os.sep),
+    ("aiohttp", os.sep + "aiohttp" + os.sep),
+    ("asyncio", os.sep + "asyncio" + os.sep),
+)
+
+
+def _package(filename: str) -> str:
+    """Return the package a profiled function belongs to."""
+    for package, marker in PACKAGE_MARKERS:
+        if marker in filename:
+            return package
+    if filename == "~":
+        # Built-in functions
+        return "builtins"
+    return "other"
+
+
+class PollProfiler:
+    """Profile the next poll cycles of a coordinator.
+
+    cProfile runs from the start of each cycle until its entities have been
+    dispatched. It profiles the whole thread, so whatever else the event
+    loop runs while a cycle waits on the cloud is included. The phase timers
+    only count the integration's own work: waiting for the semaphore and
+    request limiter, the HTTP round trip, JSON parsing, login crypto,
+    decoding, statistics and entity dispatch.
+    """
+
+    def __init__(self, polls: int) -> None:
+        """Initialize a profiler for a number of poll cycles."""
+        self.polls = polls
+        self.cycles = 0
+        self.started_at = dt_util.utcnow()
+        # Count, total and maximum seconds per phase
+        self.phases: dict[str, list[float]] = {}
+        self.cprofile_skipped = 0
+        self._profile = cProfile.Profile()
+        self._profiling = False
+        self._cycle_started = 0.0
+
+    @property
+    def done(self) -> bool:
+        """Return True once every cycle has been profiled."""
+        return self.cycles >= self.polls
+
+    def start_cycle(self) -> None:
+        """Start timing and profiling a poll cycle."""
+        self._cycle_started = time.monotonic()
+        if sys.getprofile() is not None:
+            # Another profiler is active; only the phases are timed
+            self.cprofile_skipped += 1
+            return
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Python 3.12+ profiles through sys.monitoring, which
+            # sys.getprofile does not report
+            self.cprofile_skipped += 1
+            return
+        self._profiling = True
+
+    def end_cycle(self) -> None:
+        """Stop profiling the current poll cycle."""
+        if self._profiling:
+            self._profile.disable()
+            self._profiling = False
+        self.add_phase("cycle", time.monotonic() - self._cycle_started)
+        self.cycles += 1
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        """Add the duration of one occurrence of a phase."""
+        if (phase := self.phases.get(name)) is None:
+            self.phases[name] = [1, seconds, seconds]
+            return
+        phase[0] += 1
+        phase[1] += seconds
+        if seconds > phase[2]:
+            phase[2] = seconds
+
+    def _stats(self) -> pstats.Stats | None:
+        """Return the collected profile, None if nothing was profiled."""
+        try:
+            return pstats.Stats(self._profile)
+        except TypeError:
+            return None
+
+    def report(self, top: int) -> dict[str, Any]:
+        """Return the phase breakdown and the most expensive functions."""
+        phases = {
+            name: {
+                "count": int(count),
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(total * 1000 / count, 3),
+                "max_ms": round(maximum * 1000, 3),
+            }
+            for name, (count, total, maximum) in sorted(
+                self.phases.items(), key=lambda item: item[1][1], reverse=True
+            )
+        }
+        report: dict[str, Any] = {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": dt_util.utcnow().isoformat(),
+            "polls": self.cycles,
+            "cprofile_skipped": self.cprofile_skipped,
+            "phases": phases,
+            "own_ms_by_package": {},
+            "top_functions": [],
+        }
+        if (stats := self._stats()) is None:
+            return report
+
+        by_package: dict[str, float] = {}
+        functions = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in (
+            stats.stats.items()  # type: ignore[attr-defined]
+        ):
+            package = _package(filename)
+            by_package[package] = by_package.get(package, 0.0) + own
+            functions.append((cumulative, own, calls, f"{filename}:{line}({name})"))
+        report["own_ms_by_package"] = {
+            package: round(own * 1000, 3)
+            for package, own in sorted(
+                by_package.items(), key=lambda item: item[1], reverse=True
+            )
+        }
+        report["top_functions"] = [
+            {
+                "function": function,
+                "calls": calls,
+                "own_ms": round(own * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+            for cumulative, own, calls, function in sorted(functions, reverse=True)[
+                :top
+            ]
+        ]
+        return report
+
+    def write(self, directory: str, name: str, top: int) -> dict[str, Any]:
+        """Write the pstats file and JSON report; returns the report.
+
+        Does blocking I/O, so it runs in the executor.
+        """
+        os.makedirs(directory, exist_ok=True)
+        report = self.report(top)
+        if self._stats() is not None:
+            report["pstats_path"] = os.path.join(directory, f"{name}.pstats")
+            self._profile.dump_stats(report["pstats_path"])
+        report["report_path"] = os.path.join(directory, f"{name}.json")
+        with open(report["report_path"], "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        return report
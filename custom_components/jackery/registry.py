@@ -0,0 +1,68 @@
+"""Resources shared by every Jackery config entry."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import AsyncJackeryAPI, JackeryLoginCipher
+from .const import DATA_REGISTRY, DEFAULT_MAX_REQUESTS_PER_SEC, DOMAIN
+from .scheduler import RequestLimiter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class JackeryClientRegistry:
+    """Hand out API clients that share one transport, cipher and budget.
+
+    Every client uses Home Assistant's pooled client session, the same
+    parsed login cipher and the same request limiter, so running several
+    accounts costs little more than running one. The registry lives in
+    hass.data[DOMAIN] while at least one config entry is loaded.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry."""
+        self.session = async_get_clientsession(hass)
+        self.cipher = JackeryLoginCipher()
+        self.limiter = RequestLimiter(DEFAULT_MAX_REQUESTS_PER_SEC)
+        self._clients: dict[str, AsyncJackeryAPI] = {}
+
+    @callback
+    def async_create_client(self, account: str, password: str) -> AsyncJackeryAPI:
+        """Create a client on the shared transport and cipher."""
+        return AsyncJackeryAPI(
+            self.session, account=account, password=password, cipher=self.cipher
+        )
+
+    @callback
+    def async_register(
+        self, entry_id: str, client: AsyncJackeryAPI, max_requests_per_sec: float
+    ) -> None:
+        """Track the client of a config entry and its share of the budget."""
+        self._clients[entry_id] = client
+        self.limiter.set_limit(entry_id, max_requests_per_sec)
+
+    async def async_release(self, entry_id: str) -> bool:
+        """Shut down the client of an unloaded entry.
+
+        Returns True if no entries are left and the registry was shut down.
+        """
+        self.limiter.remove_limit(entry_id)
+        if (client := self._clients.pop(entry_id, None)) is not None:
+            await client.async_close()
+        if self._clients:
+            return False
+        _LOGGER.debug("Last Jackery entry unloaded, shutting down shared clients")
+        return True
+
+
+@callback
+def async_get_registry(hass: HomeAssistant) -> JackeryClientRegistry:
+    """Return the shared registry, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (registry := domain_data.get(DATA_REGISTRY)) is None:
+        registry = domain_data[DATA_REGISTRY] = JackeryClientRegistry(hass)
+    return registry
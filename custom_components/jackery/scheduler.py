@@ -0,0 +1,298 @@
+"""Polling schedule for Jackery devices."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+from typing import Any
+
+# Properties that report power flowing in or out of the device
+ACTIVITY_POWER_KEYS = ("ip", "op")
+
+# Output toggles; a device with any output switched on is considered active
+ACTIVITY_OUTPUT_KEYS = ("oac", "odc", "odcc", "odcu")
+
+
+def is_active(properties: dict[str, Any]) -> bool:
+    """Return True if a device is charging, discharging or has an output on."""
+    return any(properties.get(key) for key in ACTIVITY_POWER_KEYS) or any(
+        properties.get(key) == 1 for key in ACTIVITY_OUTPUT_KEYS
+    )
+
+
+class DevicePollScheduler:
+    """Decide when each device should be polled next.
+
+    Active devices are polled every min_interval seconds and idle devices
+    every max_interval seconds. A device whose request failed backs off
+    exponentially from min_interval, up to backoff_max seconds. Every
+    interval is stretched or shrunk by a random fraction of up to jitter, so
+    devices that started together drift apart instead of being polled in
+    synchronized bursts. A device with an override is polled at that fixed
+    interval instead. Times are monotonic timestamps supplied by the caller.
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        backoff_max: float,
+        jitter: float = 0.0,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.overrides: dict[str, float] = {}
+        self._next_poll: dict[str, float] = {}
+        self._last_poll: dict[str, float] = {}
+        self._failures: dict[str, int] = {}
+
+    def configure(
+        self,
+        min_interval: float,
+        max_interval: float,
+        backoff_max: float,
+        overrides: dict[str, float],
+        now: float,
+    ) -> None:
+        """Change the intervals; polls scheduled further out are brought in."""
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff_max = backoff_max
+        self.overrides = overrides
+        for device_id, next_poll in self._next_poll.items():
+            if device_id in self._failures:
+                continue
+            limit = now + self._jittered(
+                overrides.get(device_id, self.max_interval)
+            )
+            if next_poll > limit:
+                self._next_poll[device_id] = limit
+
+    def due(self, device_ids: list[str], now: float) -> list[str]:
+        """Return the devices that should be polled now."""
+        return [
+            device_id
+            for device_id in device_ids
+            if self._next_poll.get(device_id, 0) <= now
+        ]
+
+    def next_due(self, device_ids: list[str]) -> float | None:
+        """Return the earliest time any of the devices is due."""
+        return min(
+            (self._next_poll.get(device_id, 0) for device_id in device_ids),
+            default=None,
+        )
+
+    def due_at(self, device_id: str) -> float:
+        """Return when a device is due; devices never polled are due at 0."""
+        return self._next_poll.get(device_id, 0)
+
+    def polled_within(self, device_id: str, seconds: float, now: float) -> bool:
+        """Return True if a device was polled less than seconds ago."""
+        last_poll = self._last_poll.get(device_id)
+        return last_poll is not None and now - last_poll < seconds
+
+    def _jittered(self, interval: float) -> float:
+        """Apply the random jitter to an interval."""
+        if not self.jitter:
+            return interval
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def seconds_until_due(self, device_id: str, now: float) -> float:
+        """Return how long until a device is due, 0 if it already is."""
+        return max(self._next_poll.get(device_id, 0) - now, 0)
+
+    def record_success(
+        self, device_id: str, properties: dict[str, Any], now: float
+    ) -> float:
+        """Schedule the next poll after a successful fetch."""
+        self._failures.pop(device_id, None)
+        self._last_poll[device_id] = now
+        interval = self.overrides.get(device_id)
+        if interval is None:
+            interval = (
+                self.min_interval if is_active(properties) else self.max_interval
+            )
+        interval = self._jittered(interval)
+        self._next_poll[device_id] = now + interval
+        return interval
+
+    def record_failure(self, device_id: str, now: float) -> float:
+        """Schedule the next poll after a failed fetch."""
+        failures = self._failures.get(device_id, 0) + 1
+        self._failures[device_id] = failures
+        self._last_poll[device_id] = now
+        interval = self._jittered(
+            min(self.min_interval * 2 ** (failures - 1), self.backoff_max)
+        )
+        self._next_poll[device_id] = now + interval
+        return interval
+
+    def remove(self, device_id: str) -> None:
+        """Forget a device."""
+        self._next_poll.pop(device_id, None)
+        self._last_poll.pop(device_id, None)
+        self._failures.pop(device_id, None)
+
+
+class RequestLimiter:
+    """A token bucket shared by every config entry.
+
+    Callers await acquire() before each request. Tokens are refilled at the
+    lowest requests-per-second limit any entry configured, up to one second
+    worth of burst. Waiting callers are served lowest priority first; the
+    coordinators pass the time a device was due, so the most overdue devices
+    go first regardless of their account.
+    """
+
+    def __init__(self, default_rate: float) -> None:
+        """Initialize the limiter."""
+        self._default_rate = default_rate
+        self._limits: dict[str, float] = {}
+        self._tokens = 1.0
+        self._updated: float | None = None
+        self._waiters: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def rate(self) -> float:
+        """Return the effective requests per second."""
+        return min(self._limits.values(), default=self._default_rate)
+
+    def set_limit(self, key: str, rate: float) -> None:
+        """Set the requests-per-second limit requested by a config entry."""
+        self._limits[key] = rate
+
+    def remove_limit(self, key: str) -> None:
+        """Drop the limit of an unloaded config entry."""
+        self._limits.pop(key, None)
+
+    async def acquire(self, priority: float = 0.0) -> None:
+        """Wait until a request may be sent."""
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._timer is None:
+            self._dispatch()
+        await future
+
+    def _dispatch(self) -> None:
+        """Hand out available tokens and wait for the next one if needed."""
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        rate = self.rate
+        burst = max(rate, 1.0)
+        if self._updated is not None:
+            self._tokens = min(burst, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                # The waiter was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            if self._tokens < 1:
+                break
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            future.set_result(None)
+
+        if self._waiters:
+            self._timer = loop.call_later((1 - self._tokens) / rate, self._dispatch)
+
+
+class CircuitBreaker:
+    """Stop requests to a degraded cloud and probe before resuming.
+
+    The breaker opens after failure_threshold consecutive failed or slow
+    requests; a request counts as slow when it took longer than slow_request
+    seconds. While open no requests are allowed. After reset_timeout seconds
+    it becomes half-open and allows a single probe: success closes it, failure
+    opens it again with the timeout doubled up to max_reset_timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        slow_request: float,
+        reset_timeout: float,
+        max_reset_timeout: float,
+    ) -> None:
+        """Initialize a closed breaker."""
+        self.failure_threshold = failure_threshold
+        self.slow_request = slow_request
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.failures = 0
+        self.times_opened = 0
+        self._timeout = reset_timeout
+        self._opened_at: float | None = None
+        self._probing = False
+
+    def state(self, now: float) -> str:
+        """Return the state of the breaker at a monotonic time."""
+        if self._opened_at is None:
+            return self.CLOSED
+        if now - self._opened_at < self._timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def retry_at(self) -> float | None:
+        """Return when an open breaker allows a probe."""
+        if self._opened_at is None:
+            return None
+        return self._opened_at + self._timeout
+
+    def allow_request(self, now: float) -> bool:
+        """Return True if a request may be sent; claims the half-open probe."""
+        state = self.state(now)
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def reset(self) -> None:
+        """Close the breaker, as when the cloud it guards was replaced."""
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._timeout = self.reset_timeout
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe that was never sent."""
+        self._probing = False
+
+    def record_success(self, duration: float, now: float) -> None:
+        """Record a completed request and how long it took."""
+        if duration > self.slow_request:
+            self.record_failure(now)
+            return
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._timeout = self.reset_timeout
+
+    def record_failure(self, now: float) -> None:
+        """Record a failed request."""
+        self.failures += 1
+        if self._probing:
+            # The probe failed, stay open for longer
+            self._probing = False
+            self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+            self._opened_at = now
+        elif self._opened_at is None and self.failures >= self.failure_threshold:
+            self._opened_at = now
+            self.times_opened += 1
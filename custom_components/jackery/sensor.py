@@ -2,19 +2,91 @@
 
 from __future__ import annotations
 
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Any
+
 from homeassistant.components.sensor import (
     SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .api import DEVICE_PROPERTY_PATH, LOGIN_PATH, AsyncJackeryAPI
+from .const import (
+    DOMAIN,
+    SENSOR_DESCRIPTIONS,
+    STATISTIC_SENSOR_DESCRIPTIONS,
+    THROTTLED_SENSOR_KEYS,
+    THROTTLED_WRITE_INTERVAL_SEC,
+    JackerySensorEntityDescription,
+    JackeryStatisticSensorEntityDescription,
 )
+from .coordinator import JackeryCoordinator
+from .entity import JackeryEntity, async_setup_capability_entities
+
+
+@dataclass
+class JackeryDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes a Jackery API diagnostic sensor entity."""
+
+    value: Callable[[AsyncJackeryAPI], Any] | None = None
 
-from .const import DOMAIN, SENSOR_DESCRIPTIONS, JackerySensorEntityDescription
+
+# Request statistics of the account's API client; disabled by default as
+# they change on every poll
+DIAGNOSTIC_SENSOR_DESCRIPTIONS: tuple[JackeryDiagnosticSensorEntityDescription, ...] = (
+    JackeryDiagnosticSensorEntityDescription(
+        key="property_latency_p95",
+        name="Property Request Latency (p95)",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        icon="mdi:timer-outline",
+        value=lambda api: api.stats.endpoint(DEVICE_PROPERTY_PATH).percentile(95),
+    ),
+    JackeryDiagnosticSensorEntityDescription(
+        key="login_latency_p95",
+        name="Login Latency (p95)",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        icon="mdi:timer-lock-outline",
+        value=lambda api: api.stats.endpoint(LOGIN_PATH).percentile(95),
+    ),
+    JackeryDiagnosticSensorEntityDescription(
+        key="request_successes",
+        name="Successful Requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:check-network-outline",
+        value=lambda api: api.stats.total("successes"),
+    ),
+    JackeryDiagnosticSensorEntityDescription(
+        key="request_errors",
+        name="Request Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:alert-circle-outline",
+        value=lambda api: api.stats.total("errors"),
+    ),
+    JackeryDiagnosticSensorEntityDescription(
+        key="request_timeouts",
+        name="Request Timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:timer-alert-outline",
+        value=lambda api: api.stats.total("timeouts"),
+    ),
+    JackeryDiagnosticSensorEntityDescription(
+        key="token_relogins",
+        name="Token Expiry Re-logins",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        icon="mdi:key-change",
+        value=lambda api: api.stats.token_expired,
+    ),
+)
 
 
 async def async_setup_entry(
@@ -24,55 +96,133 @@ async def async_setup_entry(
 ) -> None:
     """Set up the Jackery sensor entities."""
     entry_data = hass.data[DOMAIN][config_entry.entry_id]
-    coordinators: dict[str, DataUpdateCoordinator] = entry_data["coordinators"]
-    devices: list[dict] = entry_data["devices"]
+    coordinator: JackeryCoordinator = entry_data["coordinator"]
 
-    entities = []
-    for device in devices:
-        device_id = device["devId"]
-        if device_id in coordinators:
-            coordinator = coordinators[device_id]
-            # Create entities for all sensor descriptions
-            for description in SENSOR_DESCRIPTIONS:
-                entities.append(JackerySensor(coordinator, description, device))
+    # Only create entities for the keys each device model reports
+    config_entry.async_on_unload(
+        async_setup_capability_entities(
+            coordinator, SENSOR_DESCRIPTIONS, JackerySensor, async_add_entities
+        )
+    )
+    config_entry.async_on_unload(
+        async_setup_capability_entities(
+            coordinator,
+            STATISTIC_SENSOR_DESCRIPTIONS,
+            JackeryStatisticSensor,
+            async_add_entities,
+        )
+    )
 
-    async_add_entities(entities)
+    async_add_entities(
+        JackeryDiagnosticSensor(coordinator, description, config_entry)
+        for description in DIAGNOSTIC_SENSOR_DESCRIPTIONS
+    )
 
 
-class JackerySensor(CoordinatorEntity, SensorEntity):
+class JackerySensor(JackeryEntity, SensorEntity):
     """Implementation of a Jackery sensor."""
 
     entity_description: JackerySensorEntityDescription
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: JackeryCoordinator,
         description: JackerySensorEntityDescription,
         device_info: dict,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, description.key, device_info)
         self.entity_description = description
-        self._device_id = device_info["devId"]
+        self._write_interval: float | None = None
+        self._last_write = 0.0
+        if coordinator.statistics is not None:
+            if description.state_class == SensorStateClass.MEASUREMENT:
+                # The coordinator imports the long-term statistics instead
+                self._attr_state_class = None
+            if description.key in THROTTLED_SENSOR_KEYS:
+                self._write_interval = THROTTLED_WRITE_INTERVAL_SEC
 
-        # Set a unique ID for this entity
-        self._attr_unique_id = f"{self._device_id}_{description.key}"
+    def _value_changed(self) -> bool:
+        """Return True if the value changed and is due to be written."""
+        if not super()._value_changed():
+            return False
+        if self._write_interval is None:
+            return True
+        now = time.monotonic()
+        if now - self._last_write < self._write_interval:
+            return False
+        self._last_write = now
+        return True
 
-        # Set the device info for this entity
-        # This groups all sensors under a single device in Home Assistant
+    @property
+    def native_value(self) -> str | int | float | datetime | None:
+        """Return the state of the sensor."""
+        # Converted once per poll by the coordinator's decode table
+        return self.decoded_value
+
+
+class JackeryStatisticSensor(JackeryEntity, SensorEntity):
+    """A rolling statistic or energy total from a device's power history."""
+
+    entity_description: JackeryStatisticSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: JackeryCoordinator,
+        description: JackeryStatisticSensorEntityDescription,
+        device_info: dict,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, description.key, device_info)
+        self.entity_description = description
+        self._last_value: float | None = None
+
+    def _value_changed(self) -> bool:
+        """Return True if the statistic moved since it was last written."""
+        value = self.native_value
+        if value == self._last_value:
+            return False
+        self._last_value = value
+        return True
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the statistic."""
+        history = self.coordinator.power_history.get(self._device_id)
+        if history is None or self.entity_description.value is None:
+            return None
+        return self.entity_description.value(history)
+
+
+class JackeryDiagnosticSensor(CoordinatorEntity[JackeryCoordinator], SensorEntity):
+    """Request statistics of a Jackery account's API client."""
+
+    entity_description: JackeryDiagnosticSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: JackeryCoordinator,
+        description: JackeryDiagnosticSensorEntityDescription,
+        config_entry: ConfigEntry,
+    ) -> None:
+        """Initialize the diagnostic sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+
+        # Group the account's diagnostics under a service device
         self._attr_device_info = {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": device_info.get("devName", f"Jackery Device {self._device_id}"),
+            "identifiers": {(DOMAIN, config_entry.entry_id)},
+            "name": f"Jackery {config_entry.title}",
             "manufacturer": "Jackery",
-            "model": device_info.get("productType"),
+            "entry_type": DeviceEntryType.SERVICE,
         }
 
     @property
-    def native_value(self) -> str | int | float | datetime | None:
-        """Return the state of the sensor."""
-        value = self.coordinator.data.get(self.entity_description.key)
-        if value is None:
+    def native_value(self) -> int | float | None:
+        """Return the current statistic."""
+        if self.entity_description.value is None:
             return None
-        if self.entity_description.value:
-            return self.entity_description.value(value)
-        return value
+        return self.entity_description.value(self.coordinator.api)
@@ -0,0 +1,103 @@
+"""Services of the Jackery integration."""
+
+from __future__ import annotations
+
+import asyncio
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+from .const import (
+    ATTR_POLLS,
+    DEFAULT_PROFILE_POLLS,
+    DOMAIN,
+    MAX_PROFILE_POLLS,
+    SERVICE_PROFILE,
+    SERVICE_REFRESH,
+)
+from .coordinator import JackeryCoordinator
+
+REFRESH_SCHEMA = cv.make_entity_service_schema({})
+PROFILE_SCHEMA = cv.make_entity_service_schema(
+    {
+        vol.Optional(ATTR_POLLS, default=DEFAULT_PROFILE_POLLS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_POLLS)
+        ),
+    }
+)
+
+
+def _async_targeted_devices(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[JackeryCoordinator, set[str]]:
+    """Return the Jackery devices a service call targets, per coordinator.
+
+    Targeting an account's service device selects every device of the
+    account; targeting an entity selects the device it belongs to.
+    """
+    selected = async_extract_referenced_entity_ids(hass, call)
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+
+    device_entry_ids = set(selected.referenced_devices)
+    for entity_id in selected.referenced | selected.indirectly_referenced:
+        entity = entity_registry.async_get(entity_id)
+        if entity is not None and entity.platform == DOMAIN and entity.device_id:
+            device_entry_ids.add(entity.device_id)
+
+    targets: dict[JackeryCoordinator, set[str]] = {}
+    for device_entry_id in device_entry_ids:
+        if (device := device_registry.async_get(device_entry_id)) is None:
+            continue
+        for domain, identifier in device.identifiers:
+            if domain != DOMAIN:
+                continue
+            for entry_id in device.config_entries:
+                if (entry_data := hass.data.get(DOMAIN, {}).get(entry_id)) is None:
+                    continue
+                coordinator: JackeryCoordinator = entry_data["coordinator"]
+                if identifier == entry_id:
+                    targets.setdefault(coordinator, set()).update(
+                        coordinator.devices
+                    )
+                elif identifier in coordinator.devices:
+                    targets.setdefault(coordinator, set()).add(identifier)
+    return targets
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Jackery services."""
+
+    async def async_refresh(call: ServiceCall) -> None:
+        """Fetch the targeted devices now."""
+        if not (targets := _async_targeted_devices(hass, call)):
+            raise ServiceValidationError("No loaded Jackery device was targeted")
+        await asyncio.gather(
+            *(
+                coordinator.async_refresh_devices(device_ids)
+                for coordinator, device_ids in targets.items()
+            )
+        )
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile the next poll cycles of the targeted accounts."""
+        if not (targets := _async_targeted_devices(hass, call)):
+            raise ServiceValidationError("No loaded Jackery device was targeted")
+        if any(coordinator.profiler is not None for coordinator in targets):
+            raise ServiceValidationError("A Jackery profile is already running")
+        for coordinator in targets:
+            coordinator.async_start_profile(call.data[ATTR_POLLS])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, async_refresh, schema=REFRESH_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
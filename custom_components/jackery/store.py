@@ -0,0 +1,125 @@
+"""Persistent storage for Jackery."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.storage import Store
+
+from .api import AsyncJackeryAPI
+from .const import (
+    DOMAIN,
+    SNAPSHOT_SAVE_DELAY_SEC,
+    SNAPSHOT_STORAGE_KEY,
+    SNAPSHOT_STORAGE_VERSION,
+    TOKEN_SAVE_DELAY_SEC,
+    TOKEN_STORAGE_KEY,
+    TOKEN_STORAGE_VERSION,
+)
+
+
+class JackeryTokenStore:
+    """Keep auth tokens per account across restarts and reloads.
+
+    The config flow saves the token from its validation login, so the first
+    setup of the entry can reuse it instead of logging in again.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the token store."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, TOKEN_STORAGE_VERSION, TOKEN_STORAGE_KEY, private=True
+        )
+        self._tokens: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored tokens."""
+        self._tokens = await self._store.async_load() or {}
+
+    @callback
+    def async_restore(self, api: AsyncJackeryAPI, endpoints: list[str]) -> None:
+        """Hand a stored token to the client and persist any new ones.
+
+        Tokens are only valid on the endpoint that issued it, so the client
+        also switches to that endpoint; a token issued by an endpoint that is
+        no longer configured is not restored.
+        """
+        if stored := self._tokens.get(api.account):
+            endpoint = stored.get("endpoint", api.default_base_url)
+            if endpoint in endpoints:
+                api.set_base_url(endpoint)
+                api.set_token(stored["token"], stored["issued_at"])
+
+        @callback
+        def _token_listener(token: str, issued_at: float) -> None:
+            self.async_set_token(api.account, token, issued_at, api.base_url)
+
+        api.set_token_listener(_token_listener)
+
+    @callback
+    def async_set_token(
+        self, account: str, token: str, issued_at: float, endpoint: str
+    ) -> None:
+        """Store a newly issued token for an account and its endpoint."""
+        self._tokens[account] = {
+            "token": token,
+            "issued_at": issued_at,
+            "endpoint": endpoint,
+        }
+        self._store.async_delay_save(lambda: self._tokens, TOKEN_SAVE_DELAY_SEC)
+
+    @callback
+    def async_remove_token(self, account: str) -> None:
+        """Forget the token of an account."""
+        if self._tokens.pop(account, None) is not None:
+            self._store.async_delay_save(lambda: self._tokens, TOKEN_SAVE_DELAY_SEC)
+
+
+class JackerySnapshotStore:
+    """Keep the last known state of a config entry across restarts.
+
+    Setup restores the device list, capabilities and decoded values from
+    here, so entities are created with a state before the first poll.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot store of a config entry."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            SNAPSHOT_STORAGE_VERSION,
+            f"{SNAPSHOT_STORAGE_KEY}.{entry_id}",
+            private=True,
+        )
+        self._next_save = 0.0
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Load the saved snapshot, if any."""
+        return await self._store.async_load()
+
+    @callback
+    def async_schedule_save(self, data_func: Callable[[], dict[str, Any]]) -> None:
+        """Save the state returned by data_func after a delay.
+
+        data_func is called when the save happens, so calls while a save is
+        pending are dropped instead of pushing it back on every poll.
+        """
+        if (now := time.monotonic()) < self._next_save:
+            return
+        self._next_save = now + SNAPSHOT_SAVE_DELAY_SEC
+        self._store.async_delay_save(data_func, SNAPSHOT_SAVE_DELAY_SEC)
+
+    async def async_remove(self) -> None:
+        """Delete the saved snapshot."""
+        await self._store.async_remove()
+
+
+@singleton(f"{DOMAIN}_token_store")
+async def async_get_token_store(hass: HomeAssistant) -> JackeryTokenStore:
+    """Return the token store, loading it on first use."""
+    token_store = JackeryTokenStore(hass)
+    await token_store.async_load()
+    return token_store
@@ -1,24 +1,148 @@
 #!/usr/bin/env python3
-"""Test script for Jackery API debugging."""
+"""Test script for Jackery API debugging.
 
+Talk to the live cloud, optionally recording the exchanges to a cassette:
+
+    python test_api.py <username> <password> [--record cassette.json.gz]
+
+or replay recorded cassettes against a local server and profile the client
+and decode path offline:
+
+    python test_api.py --replay cassette.json.gz [more.json.gz ...]
+        [--speed 1.0] [--concurrency 8] [--rounds 10] [--copies 1]
+        [--profile replay.pstats]
+
+Cassettes hold the login, bind/list and property exchanges with tokens,
+credentials and other personal fields scrubbed and device IDs replaced by
+stable pseudonyms.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import gzip
+import itertools
+import json
 import logging
+import os
+import statistics
 import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+from api import (
+    DEVICE_LIST_PATH,
+    DEVICE_PROPERTY_PATH,
+    LOGIN_PATH,
+    AsyncJackeryAPI,
+    JackeryAPI,
+    JackeryAuthenticationError,
+)
 
-from api import JackeryAPI, JackeryAuthenticationError
+CASSETTE_VERSION = 1
 
-# Set up logging
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Fields replaced by SCRUBBED wherever they appear in a recorded body
+SCRUBBED_KEYS = frozenset(
+    {"token", "account", "password", "phone", "email", "mobile", "userId", "macId"}
 )
+SCRUBBED = "**REDACTED**"
+
+# Fields holding device IDs, replaced by pseudonyms
+DEVICE_ID_KEYS = ("devId", "deviceId")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CassetteRecorder:
+    """Collect scrubbed exchanges from the blocking client's session."""
+
+    def __init__(self, extra_scrubbed_keys=()):
+        """Initialize an empty cassette."""
+        self.interactions = []
+        self._scrubbed_keys = SCRUBBED_KEYS | frozenset(extra_scrubbed_keys)
+        self._pseudonyms = {}
+
+    def attach(self, api):
+        """Record every response of a JackeryAPI."""
+        api._session.hooks["response"].append(self._record)
 
+    def _pseudonym(self, device_id):
+        if device_id not in self._pseudonyms:
+            self._pseudonyms[device_id] = f"device{len(self._pseudonyms) + 1:03d}"
+        return self._pseudonyms[device_id]
 
-def test_jackery_api(username, password):
+    def scrub(self, value):
+        """Return a copy of a body without credentials or real device IDs."""
+        if isinstance(value, dict):
+            scrubbed = {}
+            for key, item in value.items():
+                if key in self._scrubbed_keys:
+                    scrubbed[key] = SCRUBBED
+                elif key in DEVICE_ID_KEYS and isinstance(item, (str, int)):
+                    scrubbed[key] = self._pseudonym(str(item))
+                else:
+                    scrubbed[key] = self.scrub(item)
+            return scrubbed
+        if isinstance(value, list):
+            return [self.scrub(item) for item in value]
+        return value
+
+    def _record(self, response, *args, **kwargs):
+        url = urlsplit(response.request.url)
+        if url.path not in (LOGIN_PATH, DEVICE_LIST_PATH, DEVICE_PROPERTY_PATH):
+            return
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        # Login parameters carry the encrypted credentials and are dropped
+        params = {} if url.path == LOGIN_PATH else dict(parse_qsl(url.query))
+        self.interactions.append(
+            {
+                "path": url.path,
+                "params": self.scrub(params),
+                "status": response.status_code,
+                "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 1),
+                "body": self.scrub(body),
+            }
+        )
+
+    def save(self, path):
+        """Write the cassette, gzipped if the path ends with .gz."""
+        cassette = {
+            "version": CASSETTE_VERSION,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "interactions": self.interactions,
+        }
+        data = json.dumps(cassette, separators=(",", ":")).encode("utf-8")
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wb") as file:
+            file.write(data)
+        print(f"📼 Recorded {len(self.interactions)} exchanges to {path}")
+
+
+def load_cassette(path):
+    """Read a cassette written by CassetteRecorder."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as file:
+        cassette = json.loads(file.read())
+    if cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version in {path}")
+    return cassette["interactions"]
+
+
+def test_jackery_api(username, password, recorder=None):
     """Test the Jackery API connection."""
     print(f"Testing Jackery API with username: {username}")
 
     try:
         # Create API instance
         api = JackeryAPI(account=username, password=password)
+        if recorder:
+            recorder.attach(api)
 
         # Test login
         print("Testing login...")
@@ -39,10 +163,10 @@ def test_jackery_api(username, password):
             device_name = device.get("devName", "Unknown")
             print(f"  - Device: {device_name} (ID: {device_id})")
 
-        # Test device detail for first device
-        if devices:
-            first_device = devices[0]
-            device_id = first_device["devId"]
+        # Test device detail for the first device, or all of them when
+        # recording so the cassette covers every model
+        for device in devices if recorder else devices[:1]:
+            device_id = device["devId"]
             print(f"Testing device detail for {device_id}...")
 
             device_detail = api.get_device_detail(device_id)
@@ -62,13 +186,237 @@ def test_jackery_api(username, password):
         return False
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python test_api.py <username> <password>")
+class ReplayServer:
+    """Serve recorded exchanges on a local port.
+
+    Property requests cycle through the payloads recorded for each device.
+    Responses are delayed by the recorded latency divided by speed; a speed
+    of 0 answers immediately. With copies > 1 every device appears that
+    many times under distinct IDs.
+    """
+
+    def __init__(self, cassettes, speed=1.0, copies=1):
+        """Index the recorded exchanges."""
+        self.speed = speed
+        self.login = None
+        self.devices = []
+        self.properties = {}
+        for index, interactions in enumerate(cassettes):
+            # Keep pseudonyms from different cassettes apart
+            prefix = f"{index}-" if len(cassettes) > 1 else ""
+            for interaction in interactions:
+                path = interaction["path"]
+                if path == LOGIN_PATH and self.login is None:
+                    self.login = interaction
+                elif path == DEVICE_LIST_PATH and interaction["body"]:
+                    for device in interaction["body"].get("data", []):
+                        for copy in range(copies):
+                            suffix = f"#{copy}" if copy else ""
+                            self.devices.append(
+                                {**device, "devId": f"{prefix}{device['devId']}{suffix}"}
+                            )
+                elif path == DEVICE_PROPERTY_PATH:
+                    device_id = interaction["params"].get("deviceId")
+                    for copy in range(copies):
+                        suffix = f"#{copy}" if copy else ""
+                        self.properties.setdefault(
+                            f"{prefix}{device_id}{suffix}", []
+                        ).append(interaction)
+        self._cycles = {
+            device_id: itertools.cycle(interactions)
+            for device_id, interactions in self.properties.items()
+        }
+        self.devices = [
+            device for device in self.devices if device["devId"] in self.properties
+        ]
+        self._runner = None
+        self.url = ""
+
+    async def _respond(self, interaction):
+        from aiohttp import web
+
+        if self.speed > 0:
+            await asyncio.sleep(interaction["elapsed_ms"] / 1000 / self.speed)
+        if interaction["body"] is None:
+            return web.Response(status=interaction["status"])
+        return web.json_response(interaction["body"], status=interaction["status"])
+
+    async def _handle_login(self, request):
+        from aiohttp import web
+
+        await request.read()
+        if self.login is None:
+            return web.json_response({"code": 0, "token": "replay"})
+        return await self._respond(self.login)
+
+    async def _handle_device_list(self, request):
+        from aiohttp import web
+
+        return web.json_response({"code": 0, "msg": "success", "data": self.devices})
+
+    async def _handle_property(self, request):
+        from aiohttp import web
+
+        cycle = self._cycles.get(request.query.get("deviceId", ""))
+        if cycle is None:
+            return web.json_response({"code": 10100, "msg": "Device not found"})
+        return await self._respond(next(cycle))
+
+    async def start(self):
+        """Start serving on a random local port."""
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_post(LOGIN_PATH, self._handle_login)
+        app.router.add_get(DEVICE_LIST_PATH, self._handle_device_list)
+        app.router.add_get(DEVICE_PROPERTY_PATH, self._handle_property)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        """Stop the server."""
+        if self._runner:
+            await self._runner.cleanup()
+
+
+def _load_snapshot_decoder():
+    """Return the integration's decode function if Home Assistant is installed."""
+    sys.path.insert(0, REPO_ROOT)
+    try:
+        from custom_components.jackery.decode import decode
+    except ImportError:
+        return None
+    return decode
+
+
+def _summary(name, samples_us):
+    if not samples_us:
+        return f"  {name:<16} no samples"
+    ordered = sorted(samples_us)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (
+        f"  {name:<16} n={len(ordered):<6} p50={statistics.median(ordered):>9.1f}us "
+        f"p99={p99:>9.1f}us mean={statistics.fmean(ordered):>9.1f}us"
+    )
+
+
+async def replay(args):
+    """Replay cassettes and report dispatch and decode timings."""
+    import aiohttp
+
+    server = ReplayServer(
+        [load_cassette(path) for path in args.replay], args.speed, args.copies
+    )
+    if not server.devices:
+        print("❌ The cassettes contain no device property exchanges")
+        return False
+    await server.start()
+    decode = _load_snapshot_decoder()
+    dispatch_us, json_us, snapshot_us = [], [], []
+    errors = 0
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            api = AsyncJackeryAPI(session, account="replay", password="replay")
+            api.base_url = server.url
+            await api.login()
+            device_ids = [
+                device["devId"]
+                for device in (await api.get_device_list()).get("data", [])
+            ]
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def fetch(device_id):
+                nonlocal errors
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        detail = await api.get_device_detail(device_id)
+                    except Exception:  # pylint: disable=broad-except
+                        errors += 1
+                        return
+                    dispatch_us.append((time.perf_counter() - started) * 1e6)
+                properties = detail.get("data", {}).get("properties", {})
+                # What decoding the body costs without the transport
+                raw = json.dumps(detail)
+                started = time.perf_counter()
+                json.loads(raw)
+                json_us.append((time.perf_counter() - started) * 1e6)
+                if decode is not None:
+                    started = time.perf_counter()
+                    decode(properties)
+                    snapshot_us.append((time.perf_counter() - started) * 1e6)
+
+            profiler = cProfile.Profile() if args.profile else None
+            started = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            for _ in range(args.rounds):
+                await asyncio.gather(*(fetch(device_id) for device_id in device_ids))
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+            elapsed = time.perf_counter() - started
+    finally:
+        await server.stop()
+
+    requests = len(dispatch_us) + errors
+    print(
+        f"Replayed {requests} property requests for {len(device_ids)} devices "
+        f"in {elapsed:.2f}s ({requests / elapsed:.1f} req/s, {errors} errors, "
+        f"speed={args.speed}, concurrency={args.concurrency})"
+    )
+    print(_summary("dispatch", dispatch_us))
+    print(_summary("json decode", json_us))
+    if decode is not None:
+        print(_summary("snapshot decode", snapshot_us))
+    else:
+        print("  snapshot decode  skipped: Home Assistant is not installed")
+    if args.profile:
+        print(f"📊 Profile written to {args.profile}")
+    return errors == 0
+
+
+def main():
+    """Parse arguments and run the live test or a replay."""
+    parser = argparse.ArgumentParser(description="Jackery API debugging and profiling")
+    parser.add_argument("username", nargs="?")
+    parser.add_argument("password", nargs="?")
+    parser.add_argument("--record", metavar="CASSETTE", help="record the live exchanges")
+    parser.add_argument(
+        "--scrub", nargs="*", default=[], metavar="KEY", help="extra keys to scrub"
+    )
+    parser.add_argument("--replay", nargs="+", metavar="CASSETTE")
+    parser.add_argument("--speed", type=float, default=1.0, help="0 for no delay")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--copies", type=int, default=1, help="replicate every device")
+    parser.add_argument("--profile", metavar="PSTATS", help="write a cProfile dump")
+    args = parser.parse_args()
+
+    if args.replay:
+        logging.basicConfig(level=logging.WARNING)
+        return asyncio.run(replay(args))
+
+    if not args.username or not args.password:
+        parser.print_usage()
         sys.exit(1)
 
-    username = sys.argv[1]
-    password = sys.argv[2]
+    # Set up logging
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    recorder = CassetteRecorder(args.scrub) if args.record else None
+    success = test_jackery_api(args.username, args.password, recorder)
+    if recorder:
+        recorder.save(args.record)
+    return success
+
 
-    success = test_jackery_api(username, password)
-    sys.exit(0 if success else 1)
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)